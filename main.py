@@ -5,7 +5,7 @@ SKOLLR - Canvas LMS Widget Application
 
 import sys
 import os
-import concurrent.futures
+from functools import partial
 import requests
 from pathlib import Path
 from PySide6.QtWidgets import (
@@ -13,20 +13,73 @@ from PySide6.QtWidgets import (
     QPushButton, QLabel, QTabWidget, QStackedLayout, QGraphicsOpacityEffect, QStackedWidget,
     QMessageBox
 )
-from PySide6.QtCore import Qt, QPoint
+from PySide6.QtCore import Qt, QPoint, QTimer, QCoreApplication
 from PySide6.QtGui import QFont, QMouseEvent, QIcon, QPixmap
 
 from src.ui.dashboard import DashboardPage
 from src.ui.analysis import AnalysisPage
 from src.ui.course_details import CourseDetailPage
-from src.ui.graphs import GraphsPage
 from src.ui.settings import SettingsPage
 from src.ui.api_key_dialog import ApiKeyDialog
-from src.api.canvas_api import CanvasLMSAPI
+from src.ui.sync import CanvasSyncWorker, AsyncCanvasSyncWorker, failed_courses_message
+from src.ui.refresh import RefreshScheduler, intervals_from_env, DEFAULT_REFRESH_INTERVALS
+from src.utils.snapshot_store import SnapshotStore, account_key
+from src.ai.tips_cache import TipsCache
+from src.ai import gemini
+from src.ai.gemini import BATCH_CONCURRENCY, REQUESTS_PER_MINUTE
+from src.ai.context import CONTEXT_TOKEN_BUDGET
+from src.utils.records import CourseRepository
+from src.utils.log import configure_logging, set_debug, debug_enabled, get_logger
+from src.api.canvas_api import CanvasLMSAPI, new_canvas_session, CONNECT_TIMEOUT
+from src.api.response_cache import ResponseCache, DEFAULT_CACHE_TTLS
 from dotenv import load_dotenv
 
 load_dotenv()
 
+log = get_logger(__name__)
+
+SNAPSHOT_PATH = Path(__file__).parent / "skollr_snapshot.db"
+TIPS_CACHE_PATH = Path(__file__).parent / "skollr_ai_cache.db"
+# Build the Analysis and Graphs tabs in idle time after the first paint
+PREBUILD_TABS = os.getenv("SKOLLR_PREBUILD_TABS", "").strip().lower() in ("1", "true", "yes")
+# "threads" (default) or "asyncio"
+CANVAS_BACKEND = os.getenv("CANVAS_BACKEND", "threads").strip().lower()
+# Seconds before retrying everything after the launch sync fails (e.g. offline at startup)
+SYNC_RETRY_DELAY = 60
+RESPONSE_CACHE_PATH = Path(__file__).parent / "skollr_responses.db"
+# "memory" (default), "disk" to keep cached Canvas responses across restarts, or "off"
+RESPONSE_CACHE = os.getenv("SKOLLR_RESPONSE_CACHE", "memory").strip().lower()
+
+
+def positive_int_env(name, default):
+    try:
+        return max(1, int(os.getenv(name, "")))
+    except ValueError:
+        return default
+
+
+# Parallel Gemini requests for "Analyze All", and the per-minute request budget
+AI_CONCURRENCY = positive_int_env("SKOLLR_AI_CONCURRENCY", BATCH_CONCURRENCY)
+AI_REQUESTS_PER_MINUTE = positive_int_env("SKOLLR_AI_REQUESTS_PER_MINUTE", REQUESTS_PER_MINUTE)
+# Approximate tokens of course data sent with each study tips prompt
+AI_CONTEXT_TOKENS = positive_int_env("SKOLLR_AI_CONTEXT_TOKENS", CONTEXT_TOKEN_BUDGET)
+
+
+def new_response_cache():
+    """The Canvas response cache shared by every CanvasLMSAPI the widget creates"""
+    if RESPONSE_CACHE == "off":
+        return None
+    # Entries must expire before the next auto-refresh, or the refresh would never reach Canvas
+    intervals = {**DEFAULT_REFRESH_INTERVALS, **intervals_from_env(os.environ)}
+    ttls = {kind: min(DEFAULT_CACHE_TTLS[kind], intervals[kind] / 2)
+            for kind in ("assignments", "files")}
+    if RESPONSE_CACHE == "disk":
+        try:
+            return ResponseCache(ttls=ttls, disk_path=RESPONSE_CACHE_PATH)
+        except Exception as e:
+            log.warning("Could not open response cache, keeping it in memory: %s", e)
+    return ResponseCache(ttls=ttls)
+
 
 def save_api_key_to_env(key_name: str, key_value: str):
     """Save API key to .env file automatically"""
@@ -59,26 +112,34 @@ def save_api_key_to_env(key_name: str, key_value: str):
     os.environ[key_name] = key_value
 
 
-def validate_canvas_credentials(base_url: str, api_token: str):
-    """Return (ok, error_message) after attempting a lightweight Canvas call."""
+def normalize_canvas_base_url(base_url: str) -> str:
+    """Return the base URL with a scheme and without a trailing slash."""
     base_url = (base_url or "").strip()
+    # Ensure scheme
+    if base_url and not base_url.startswith("http://") and not base_url.startswith("https://"):
+        base_url = "https://" + base_url
+    return base_url.rstrip("/")
+
+
+def validate_canvas_credentials(base_url: str, api_token: str, session=None):
+    """Return (ok, error_message) after attempting a lightweight Canvas call.
+
+    Pass the running CanvasLMSAPI session to reuse its pooled connections.
+    """
+    base_url = normalize_canvas_base_url(base_url)
     api_token = (api_token or "").strip()
     if not base_url or not api_token:
         return False, "Base URL and API token are required."
 
-    # Ensure scheme
-    if not base_url.startswith("http://") and not base_url.startswith("https://"):
-        base_url = "https://" + base_url
-
-    test_url = base_url.rstrip("/") + "/api/v1/courses"
+    test_url = base_url + "/api/v1/courses"
     headers = {
         "Authorization": f"Bearer {api_token}",
-        "Content-Type": "application/json",
     }
     params = {"per_page": 1}
+    session = session or new_canvas_session(pool_size=1)
     try:
-        resp = requests.get(test_url, headers=headers,
-                            params=params, timeout=8)
+        resp = session.get(test_url, headers=headers,
+                           params=params, timeout=(CONNECT_TIMEOUT, 8))
         if resp.status_code == 200:
             return True, ""
         return False, f"Canvas replied with HTTP {resp.status_code}. Check URL/token."
@@ -89,14 +150,35 @@ def validate_canvas_credentials(base_url: str, api_token: str):
 class SkollrWidget(QMainWindow):
     """Compact desktop widget for Canvas LMS"""
 
-    def __init__(self, courses, files, assignments, canvas_api=None):
+    def __init__(self, data, canvas_api=None):
         super().__init__()
         self.dragging = False
         self.drag_position = QPoint()
 
-        self.assignments = assignments
-        self.files = files
+        # Courses, assignments and modules by course id; the pages share this object
+        self.data = data
         self.canvas_api = canvas_api
+        self.sync_worker = None
+        self.refresh_scheduler = None
+        self.api_token = None
+        self.base_url = None
+        # Set while a sync runs for credentials whose course list hasn't arrived yet
+        self.courses_loading = False
+        self.snapshot = None
+        self.response_cache = new_response_cache()
+        try:
+            self.tips_cache = TipsCache(TIPS_CACHE_PATH)
+        except Exception as e:
+            log.warning("Could not open study tips cache: %s", e)
+            self.tips_cache = None
+        # Superseded background work, kept alive until its threads finish
+        self.retired = []
+
+        # Per-course results arrive in bursts; coalesce them into one graphs rebuild
+        self.graphs_refresh_timer = QTimer(self)
+        self.graphs_refresh_timer.setSingleShot(True)
+        self.graphs_refresh_timer.setInterval(300)
+        self.graphs_refresh_timer.timeout.connect(self._rebuild_graphs)
 
         # Assets (located under src/img)
         base_dir = Path(__file__).parent
@@ -163,22 +245,29 @@ class SkollrWidget(QMainWindow):
         self.dashboard_stack = QStackedWidget()
 
         # Page 1: The Course List
-        self.dashboard_list = DashboardPage(courses, canvas_api)
-        # Connect the signal from DashboardPage to our handler
-        self.dashboard_list.course_selected.connect(self.show_course_detail)
-        self.dashboard_list.setup_canvas_api.connect(
-            self.show_canvas_api_dialog)
-
+        self.dashboard_list = self._create_dashboard_list(data, canvas_api)
         self.dashboard_stack.addWidget(self.dashboard_list)
 
         # Add the STACK to the tab, not just the page
         self.tabs.addTab(self.dashboard_stack, "Dashboard")
-        self.tabs.addTab(AnalysisPage(courses, assignments, files), "Analysis")
-        self.tabs.addTab(GraphsPage(courses, assignments), "Graphs")
 
-        self.settings_page = SettingsPage()
+        # Analysis and Graphs start as placeholders and are built on first open
+        self.lazy_tabs = {
+            1: ("Analysis", self._create_analysis_page),
+            2: ("Graphs", self._create_graphs_page),
+        }
+        self.built_tabs = set()
+        for index in sorted(self.lazy_tabs):
+            placeholder = QLabel("Loading...")
+            placeholder.setAlignment(Qt.AlignCenter)
+            self.tabs.insertTab(index, placeholder, self.lazy_tabs[index][0])
+        self.tabs.currentChanged.connect(self._ensure_tab_built)
+
+        self.settings_page = SettingsPage(debug_logging=debug_enabled())
         self.settings_page.configure_canvas.connect(
             self.show_canvas_api_dialog)
+        self.settings_page.configure_gemini.connect(self.show_gemini_dialog)
+        self.settings_page.debug_logging_toggled.connect(set_debug)
         self.tabs.addTab(self.settings_page, "Settings")
 
         foreground = QWidget()
@@ -191,27 +280,263 @@ class SkollrWidget(QMainWindow):
         # Apply initial sizing for the background logo
         self._update_background_logo_size()
 
-    def show_course_detail(self, course_data):
+    def _create_dashboard_list(self, data, canvas_api):
+        dashboard_list = DashboardPage(data, canvas_api, loading=self.courses_loading)
+        # Connect the signal from DashboardPage to our handler
+        dashboard_list.course_selected.connect(self.show_course_detail)
+        dashboard_list.setup_canvas_api.connect(self.show_canvas_api_dialog)
+        return dashboard_list
+
+    def start_canvas_sync(self, api_token, base_url, snapshot=None, canvas_api=None):
+        """Reconcile the displayed data with Canvas in the background.
+
+        Courses, then each course's assignments and modules, are pushed to the
+        pages as soon as they arrive.
+        """
+        self.api_token = api_token
+        self.base_url = base_url
+        self.snapshot = snapshot
+        self.courses_loading = True
+        if not self.data:
+            # Nothing saved for this account: show it loading rather than the setup prompt
+            self._replace_dashboard_list()
+        worker_class = AsyncCanvasSyncWorker if CANVAS_BACKEND == "asyncio" else CanvasSyncWorker
+        self.sync_worker = worker_class(
+            api_token, base_url, snapshot, canvas_api=canvas_api, cache=self.response_cache,
+            assignments=dict(self.data.assignments), modules=dict(self.data.modules))
+        self.sync_worker.courses_loaded.connect(self.on_courses_loaded)
+        self.sync_worker.course_assignments_loaded.connect(
+            self.on_course_assignments_loaded)
+        self.sync_worker.course_files_loaded.connect(self.on_course_files_loaded)
+        self.sync_worker.loaded.connect(self.apply_canvas_data)
+        self.sync_worker.error.connect(self.on_sync_failed)
+        self.sync_worker.start()
+
+    def on_courses_loaded(self, canvas_api, courses):
+        """First stage of a sync: the course list and grades"""
+        api_changed = canvas_api is not self.canvas_api
+        courses_changed = courses != list(self.data)
+        # The dashboard and analysis pages only show course names, not grades
+        names_changed = [c.name for c in courses] != [c.name for c in self.data]
+        first_courses = self.courses_loading
+        self.courses_loading = False
+        self.canvas_api = canvas_api
+
+        if courses_changed:
+            self.data.set_courses(courses)
+            self.graphs_refresh_timer.start()
+        if api_changed or names_changed or first_courses:
+            self._replace_dashboard_list()
+            self._rebuild_tab(1)
+
+    def on_course_assignments_loaded(self, course_id, assignments):
+        """A single course's assignments finished loading"""
+        self.data.assignments[course_id] = assignments
+        self.graphs_refresh_timer.start()
+
+    def on_course_files_loaded(self, course_id, modules):
+        """A single course's modules finished loading"""
+        self.data.modules[course_id] = modules
+
+    def apply_canvas_data(self, canvas_api, data):
+        """Final stage of a sync: settle on the complete result"""
+        self.on_courses_loaded(canvas_api, list(data))
+        if data.assignments != self.data.assignments:
+            self.graphs_refresh_timer.start()
+        # Drops courses that are no longer in the catalog
+        self.data.replace(data)
+        self.show_sync_error(None)
+        self.start_auto_refresh()
+
+    def on_sync_failed(self, message):
+        """The sync failed, outright or for some courses: keep the saved data and retry soon"""
+        log.warning("Canvas sync failed: %s", message)
+        self.show_sync_error(message)
+        self.start_auto_refresh()
+        QTimer.singleShot(SYNC_RETRY_DELAY * 1000,
+                          partial(self._retry_refresh, self.refresh_scheduler))
+
+    def _retry_refresh(self, scheduler):
+        # Skip if the account was switched in the meantime
+        if scheduler is self.refresh_scheduler:
+            for kind in scheduler.jobs:
+                scheduler.trigger(kind)
+
+    def on_refresh_failed(self, kind, message):
+        log.warning("Refreshing %s failed: %s", kind, message)
+        self.show_sync_error(message)
+
+    def show_sync_error(self, message):
+        """Flag in the title bar that the data on screen may be stale; None clears it"""
+        self.sync_status_label.setVisible(message is not None)
+        self.sync_status_label.setToolTip(message or "")
+
+    def reload_canvas(self, api_token, base_url, session=None):
+        """Swap Canvas credentials in place and reload the data in the background"""
+        self._retire_background_work()
+
+        # Show the new account's snapshot (if any) until the sync catches up
+        snapshot = self.snapshot
+        cached = None
+        try:
+            snapshot = snapshot or SnapshotStore(SNAPSHOT_PATH)
+            cached = snapshot.load(account_key(api_token, base_url))
+        except Exception as e:
+            log.warning("Could not read Canvas snapshot: %s", e)
+        self.data.replace(cached or CourseRepository())
+
+        self.canvas_api = CanvasLMSAPI(
+            api_token=api_token, base_url=base_url, session=session,
+            cache=self.response_cache)
+        self.go_back_to_dashboard()
+        self._replace_dashboard_list()
+        self._rebuild_tab(1)
+        self._rebuild_tab(2)
+
+        self.start_canvas_sync(api_token, base_url, snapshot, self.canvas_api)
+
+    def _retire_background_work(self):
+        """Detach the running sync and refresh jobs from the window"""
+        if self.refresh_scheduler is not None:
+            self.refresh_scheduler.stop()
+            self.refresh_scheduler.refreshed.disconnect()
+            self.refresh_scheduler.failed.disconnect()
+            self.retired.append(self.refresh_scheduler)
+            self.refresh_scheduler = None
+
+        worker = self.sync_worker
+        if worker is not None:
+            for signal in (worker.courses_loaded, worker.course_assignments_loaded,
+                           worker.course_files_loaded, worker.loaded, worker.error):
+                signal.disconnect()
+            # Stops it early and keeps it from saving the old account over the new snapshot
+            worker.requestInterruption()
+            if worker.isRunning():
+                self.retired.append(worker)
+                worker.finished.connect(lambda w=worker: self.retired.remove(w))
+            self.sync_worker = None
+
+    def start_auto_refresh(self):
+        """Keep grades, due dates and module lists fresh on their own intervals"""
+        if self.refresh_scheduler is not None:
+            return
+        # The asyncio client closes its session after loading; refresh with a threaded one
+        api = self.canvas_api
+        if not isinstance(api, CanvasLMSAPI):
+            api = CanvasLMSAPI(api_token=self.api_token, base_url=self.base_url,
+                               cache=self.response_cache)
+        if self.canvas_api is None:
+            # The launch sync failed before handing over a client
+            self.canvas_api = api
+
+        # Each factory runs on the GUI thread and snapshots the data to diff against
+        jobs = {
+            "grades": lambda: partial(api.all_courses_and_grades, refresh=True),
+            "assignments": lambda: partial(api.sync_assignments, dict(self.data.assignments)),
+            "files": lambda: partial(api.sync_files, dict(self.data.modules)),
+        }
+        self.refresh_scheduler = RefreshScheduler(
+            jobs, intervals_from_env(os.environ), parent=self)
+        self.refresh_scheduler.refreshed.connect(self.on_data_refreshed)
+        self.refresh_scheduler.failed.connect(self.on_refresh_failed)
+        self.refresh_scheduler.start()
+
+    def on_data_refreshed(self, kind, result):
+        """Apply a background refresh, touching only the pages whose data changed"""
+        failed = []
+        if kind == "grades":
+            self.on_courses_loaded(self.canvas_api, result)
+        elif kind == "assignments":
+            assignments, changed, failed = result
+            if changed:
+                self.data.assignments = assignments
+                self.graphs_refresh_timer.start()
+        elif kind == "files":
+            modules, changed, failed = result
+            # Pages read modules on demand, so nothing needs rebuilding
+            if changed:
+                self.data.modules = modules
+        # Courses Canvas kept failing keep their last records, flagged as stale
+        self.show_sync_error(failed_courses_message(failed) if failed else None)
+
+    def _replace_dashboard_list(self):
+        old_dashboard = self.dashboard_list
+        self.dashboard_list = self._create_dashboard_list(self.data, self.canvas_api)
+        self.dashboard_stack.insertWidget(0, self.dashboard_list)
+        # Leave an open course detail page where it is
+        if self.dashboard_stack.currentWidget() is old_dashboard:
+            self.dashboard_stack.setCurrentWidget(self.dashboard_list)
+        self.dashboard_stack.removeWidget(old_dashboard)
+        old_dashboard.deleteLater()
+
+    def _rebuild_graphs(self):
+        # Push new data into the open charts in place; rebuild only when that can't work
+        page = self.tabs.widget(2)
+        if 2 in self.built_tabs and hasattr(page, "update_data"):
+            if page.update_data(self.data):
+                return
+        self._rebuild_tab(2)
+
+    def _create_analysis_page(self):
+        return AnalysisPage(self.data, tips_cache=self.tips_cache,
+                            concurrency=AI_CONCURRENCY, requests_per_minute=AI_REQUESTS_PER_MINUTE,
+                            context_tokens=AI_CONTEXT_TOKENS)
+
+    def _create_graphs_page(self):
+        # Imported on first use: plotly and QtWebEngine are the heaviest imports
+        from src.ui.graphs import GraphsPage
+        return GraphsPage(self.data)
+
+    def _ensure_tab_built(self, index):
+        """Swap a lazy tab's placeholder for the real page the first time it's opened"""
+        if index in self.lazy_tabs and index not in self.built_tabs:
+            self.built_tabs.add(index)
+            label, factory = self.lazy_tabs[index]
+            self._replace_tab(index, factory(), label)
+
+    def _rebuild_tab(self, index):
+        """Rebuild a lazy tab from the current data; unopened tabs just wait"""
+        if index in self.built_tabs:
+            label, factory = self.lazy_tabs[index]
+            self._replace_tab(index, factory(), label)
+
+    def prebuild_tabs(self):
+        """Build the remaining lazy tabs one per idle tick"""
+        pending = [i for i in sorted(self.lazy_tabs) if i not in self.built_tabs]
+        if pending:
+            self._ensure_tab_built(pending[0])
+            QTimer.singleShot(0, self.prebuild_tabs)
+
+    def _replace_tab(self, index, page, label):
+        current = self.tabs.currentIndex()
+        old_page = self.tabs.widget(index)
+        # Removing the current tab moves the selection; don't let that build other tabs
+        self.tabs.blockSignals(True)
+        self.tabs.removeTab(index)
+        self.tabs.insertTab(index, page, label)
+        self.tabs.setCurrentIndex(current)
+        self.tabs.blockSignals(False)
+        if isinstance(old_page, AnalysisPage):
+            # Streaming workers outlive their page until the current chunk returns
+            old_page.cancel_analysis()
+            old_page.cancel_batch_analysis()
+            for worker in list(old_page.workers):
+                self.retired.append(worker)
+                worker.finished.connect(lambda w=worker: self.retired.remove(w))
+        old_page.deleteLater()
+
+    def show_course_detail(self, course_id):
         """Switches the Dashboard tab to show course details"""
-        course_name = course_data.get("course_name")
-
-        # 1. Filter Assignments for this course
-        # Matches structure from previous canvas_api responses
-        c_assigns = next((a["assignments"] for a in self.assignments if a.get(
-            "course_name") == course_name), [])
-
-        # 2. Filter Files for this course
-        c_files = []
-        for f_dict in self.files:
-            if course_name in f_dict:
-                c_files = f_dict[course_name]
-                break
-
-        # 3. Create Detail Page
-        detail_page = CourseDetailPage(course_name, c_assigns, c_files)
+        course = self.data.course(course_id)
+        if course is None:
+            return
+
+        # 1. Create Detail Page from this course's assignments and modules
+        detail_page = CourseDetailPage(
+            course.name, self.data.assignments_for(course_id), self.data.modules_for(course_id))
         detail_page.back_clicked.connect(self.go_back_to_dashboard)
 
-        # 4. Add to stack and show
+        # 2. Add to stack and show
         self.dashboard_stack.addWidget(detail_page)
         self.dashboard_stack.setCurrentWidget(detail_page)
 
@@ -237,10 +562,15 @@ class SkollrWidget(QMainWindow):
         )
         if dialog.exec() == 1:  # QDialog.Accepted == 1
             values = dialog.get_values()
-            api_token = values.get("canvas_api_token", "")
-            base_url = values.get("canvas_base_url", "")
-
-            ok, err = validate_canvas_credentials(base_url, api_token)
+            api_token = values.get("canvas_api_token", "").strip()
+            base_url = normalize_canvas_base_url(
+                values.get("canvas_base_url", ""))
+
+            # Only the threaded client carries a requests session to reuse;
+            # the new client keeps the connection the validation just opened
+            session = getattr(self.canvas_api, "session",
+                              None) or new_canvas_session()
+            ok, err = validate_canvas_credentials(base_url, api_token, session)
             if not ok:
                 QMessageBox.warning(self, "Canvas Connection Failed", err)
                 return
@@ -249,13 +579,29 @@ class SkollrWidget(QMainWindow):
             save_api_key_to_env("CANVAS_API_TOKEN", api_token)
             save_api_key_to_env("CANVAS_BASE_URL", base_url)
 
-            # Reload the app
-            self.close()
-            load_dotenv()
-            # Restart the app logic
-            import subprocess
-            subprocess.Popen([sys.executable, __file__])
-            QApplication.quit()
+            # Swap the credentials in place instead of restarting the process
+            self.reload_canvas(api_token, f"{base_url}/api/v1", session)
+
+    def show_gemini_dialog(self):
+        """Show dialog to change the Gemini API key and model without a restart"""
+        dialog = ApiKeyDialog(
+            self,
+            api_name="Gemini",
+            prompt_text=f"Enter your Gemini API key from Google AI Studio.\nLeave a field blank to keep the current value (model: {gemini.client.model_name}).",
+            fields=[
+                ("gemini_api_key", True, "Gemini API Key:"),
+                ("gemini_model", False, "Model (e.g., gemini-2.5-flash):")
+            ]
+        )
+        if dialog.exec() == 1:  # QDialog.Accepted == 1
+            values = dialog.get_values()
+            api_key = values.get("gemini_api_key", "")
+            model_name = values.get("gemini_model", "")
+            if api_key:
+                save_api_key_to_env("GEMINI_API_KEY", api_key)
+            if model_name:
+                save_api_key_to_env("GEMINI_MODEL", model_name)
+            gemini.client.configure(api_key=api_key, model_name=model_name)
 
     def _create_title_bar(self) -> QWidget:
         """Create custom draggable title bar with minimize/close buttons"""
@@ -286,6 +632,13 @@ class SkollrWidget(QMainWindow):
         title_label.setStyleSheet("color: white; font-weight: bold;")
         title_label.setFont(QFont("Arial", 10))
         layout.addWidget(title_label)
+
+        # Shown while Canvas can't be reached; the pages keep the last synced data
+        self.sync_status_label = QLabel("⚠ Offline")
+        self.sync_status_label.setStyleSheet("color: #f39c12; margin-left: 8px;")
+        self.sync_status_label.setFont(QFont("Arial", 9))
+        self.sync_status_label.setVisible(False)
+        layout.addWidget(self.sync_status_label)
         layout.addStretch()
 
         # Minimize button
@@ -369,38 +722,32 @@ class SkollrWidget(QMainWindow):
 
 
 if __name__ == "__main__":
+    # Required before the QApplication exists, since QtWebEngine is imported lazily
+    QCoreApplication.setAttribute(Qt.AA_ShareOpenGLContexts)
     app = QApplication(sys.argv)
+    configure_logging()
+    gemini.client.configure(model_name=os.getenv("GEMINI_MODEL"))
 
     api_token = os.environ.get("CANVAS_API_TOKEN")
     api_base_url = f'{os.getenv("CANVAS_BASE_URL", "")}/api/v1'
 
-    courses = []
-    assignments = []
-    files = []
-    canvas_api = None
+    data = CourseRepository()
+    snapshot = None
 
+    # Render straight from the last sync, then reconcile with Canvas in the background
     if api_token and api_token.strip():
         try:
-            canvas_api = CanvasLMSAPI(
-                api_token=api_token, base_url=api_base_url)
-            with concurrent.futures.ThreadPoolExecutor() as executor:
-                future_courses = executor.submit(
-                    canvas_api.all_courses_and_grades)
-                future_assignments = executor.submit(
-                    canvas_api.all_assignments)
-                future_files = executor.submit(canvas_api.all_files)
-                courses = future_courses.result()
-                assignments = future_assignments.result()
-                files = future_files.result()
+            snapshot = SnapshotStore(SNAPSHOT_PATH)
+            data = snapshot.load(account_key(api_token, api_base_url)) or data
         except Exception as e:
-            import traceback
-            print(f"Error loading Canvas data: {e}")
-            print(f"[TRACEBACK]")
-            traceback.print_exc()
-            canvas_api = CanvasLMSAPI(
-                api_token=api_token, base_url=api_base_url)
-
-    widget = SkollrWidget(courses=courses, files=files,
-                          assignments=assignments, canvas_api=canvas_api)
+            log.warning("Could not read Canvas snapshot: %s", e)
+
+    widget = SkollrWidget(data, canvas_api=None)
     widget.show()
+    if PREBUILD_TABS:
+        QTimer.singleShot(500, widget.prebuild_tabs)
+
+    if api_token and api_token.strip():
+        widget.start_canvas_sync(api_token, api_base_url, snapshot)
+
     sys.exit(app.exec())
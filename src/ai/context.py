@@ -0,0 +1,113 @@
+"""Packs a course's assignments and modules into a size-bounded prompt context"""
+
+import json
+import re
+import time
+
+from src.utils.data_transformer import format_time
+
+# Rough token budget for the course data in a prompt; Gemini averages ~4 characters per token
+CONTEXT_TOKEN_BUDGET = 3000
+CHARS_PER_TOKEN = 4
+# Share of the budget assignments may take before modules get their turn
+ASSIGNMENT_SHARE = 0.5
+# Upcoming assignments whose titles are matched against module and file names
+RELEVANCE_ASSIGNMENTS = 3
+
+STOP_WORDS = {"a", "an", "and", "for", "in", "of", "on", "the", "to", "with"}
+
+
+def compact_json(value):
+    return json.dumps(value, separators=(",", ":"), ensure_ascii=False)
+
+
+def _words(text):
+    return {w for w in re.findall(r"[a-z0-9]+", text.lower()) if w not in STOP_WORDS}
+
+
+def _rank_assignments(assignments, now):
+    """Upcoming first (soonest due), then undated, then past due (most recent first)"""
+    def rank(a):
+        if a.due_ts is None:
+            return (1, 0)
+        if a.due_ts >= now:
+            return (0, a.due_ts)
+        return (2, -a.due_ts)
+    return sorted(assignments, key=rank)
+
+
+def _rank_modules(modules, upcoming):
+    """Modules sharing words with the next assignments first; ties keep course order"""
+    targets = [_words(a.name) for a in upcoming[:RELEVANCE_ASSIGNMENTS]]
+
+    def score(module):
+        words = _words(module.name)
+        for item in module.items:
+            words |= _words(item.name)
+        return sum(len(words & target) / (rank + 1) for rank, target in enumerate(targets))
+
+    scores = [score(m) for m in modules]
+    order = sorted(range(len(modules)), key=lambda i: -scores[i])
+    return [modules[i] for i in order]
+
+
+def build_course_context(course_name, assignments, modules, current_date,
+                         token_budget=CONTEXT_TOKEN_BUDGET, now=None):
+    """The course data for a prompt, trimmed to about `token_budget` tokens of compact JSON.
+
+    Assignments are ranked by due date and modules by how closely they match the
+    next assignments; whatever doesn't fit is dropped, and the omitted counts are
+    recorded so the model knows the list is partial.
+    """
+    now = time.time() if now is None else now
+    course_context = {
+        "course_name": course_name,
+        "current_date": current_date,
+        "assignments": [],
+        "modules": []
+    }
+    remaining = token_budget * CHARS_PER_TOKEN - len(compact_json(course_context))
+
+    ranked = _rank_assignments(assignments or [], now)
+    entries = [{"title": a.name, "due_date": format_time(a.due_ts) or 'No Date'} for a in ranked]
+    sizes = [len(compact_json(e)) + 1 for e in entries]
+    # Hold back room for the omitted counts, at their largest possible values
+    omitted = {"assignments_omitted": len(entries), "modules_omitted": len(modules or [])}
+    remaining -= len(compact_json(omitted)) - 1
+
+    # Assignments up to their share, then modules, then assignments again with what's left
+    taken = 0
+    share = remaining * ASSIGNMENT_SHARE
+    while taken < len(entries) and sizes[taken] <= share:
+        course_context["assignments"].append(entries[taken])
+        share -= sizes[taken]
+        remaining -= sizes[taken]
+        taken += 1
+
+    upcoming = [a for a in ranked if a.due_ts is not None and a.due_ts >= now]
+    modules_omitted = 0
+    for module in _rank_modules(modules or [], upcoming):
+        mod_data = {"module_title": module.name, "files": []}
+        size = len(compact_json(mod_data)) + 1
+        if size > remaining:
+            modules_omitted += 1
+            continue
+        for f in module.items:
+            file_size = len(compact_json(f.name)) + 1
+            if size + file_size > remaining:
+                break
+            mod_data["files"].append(f.name)
+            size += file_size
+        course_context["modules"].append(mod_data)
+        remaining -= size
+
+    while taken < len(entries) and sizes[taken] <= remaining:
+        course_context["assignments"].append(entries[taken])
+        remaining -= sizes[taken]
+        taken += 1
+
+    if taken < len(entries):
+        course_context["assignments_omitted"] = len(entries) - taken
+    if modules_omitted:
+        course_context["modules_omitted"] = modules_omitted
+    return course_context
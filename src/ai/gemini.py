@@ -1,47 +1,104 @@
 import os
-import google.generativeai as genai
-from dotenv import load_dotenv
 import json
+import hashlib
+import threading
+import time
+from collections import deque
 from datetime import datetime
 
-load_dotenv()
+from src.ai.context import build_course_context, compact_json, CONTEXT_TOKEN_BUDGET
+from src.utils.log import get_logger
 
-genai.configure(api_key=os.getenv("GEMINI_API_KEY"))
+log = get_logger(__name__)
 
-def generate_study_tips(course_name, assignments, modules):
-    model = genai.GenerativeModel('gemini-2.5-flash')
+MODEL_NAME = 'gemini-2.5-flash'
+# Parallel requests when analyzing every course, and Gemini requests allowed per minute
+BATCH_CONCURRENCY = 3
+REQUESTS_PER_MINUTE = 10
+# How often a request waiting on the budget checks whether it was cancelled
+BUDGET_POLL_INTERVAL = 0.25
+
+
+class RequestBudget:
+    """Allows at most `per_minute` Gemini requests in any rolling 60 second window.
+
+    Shared by every worker on a page, so single clicks and batch runs draw from one quota.
+    """
+
+    def __init__(self, per_minute=REQUESTS_PER_MINUTE, window=60.0):
+        self.per_minute = per_minute
+        self.window = window
+        self.__sent = deque()
+        self.__lock = threading.Lock()
+
+    def acquire(self, cancelled=None):
+        """Blocks until a request may be sent; returns False if `cancelled()` turns true first."""
+        while True:
+            with self.__lock:
+                now = time.monotonic()
+                while self.__sent and now - self.__sent[0] >= self.window:
+                    self.__sent.popleft()
+                if len(self.__sent) < self.per_minute:
+                    self.__sent.append(now)
+                    return True
+                wait = self.window - (now - self.__sent[0])
+            if cancelled is not None and cancelled():
+                return False
+            time.sleep(min(wait, BUDGET_POLL_INTERVAL))
+
+
+class GeminiClient:
+    """One configured Gemini model, shared by every request.
+
+    google.generativeai is imported and configured on first use, so it stays off
+    the startup path. configure() swaps the key or model at runtime; requests
+    already streaming keep the model they started with.
+    """
+
+    def __init__(self, api_key=None, model_name=MODEL_NAME):
+        self.__api_key = api_key
+        self.__model_name = model_name
+        self.__model = None
+        self.__lock = threading.Lock()
+
+    @property
+    def model_name(self):
+        return self.__model_name
+
+    def configure(self, api_key=None, model_name=None):
+        """Use a new API key and/or model from the next request on"""
+        with self.__lock:
+            if api_key:
+                self.__api_key = api_key
+            if model_name:
+                self.__model_name = model_name
+            self.__model = None
+
+    def model(self):
+        with self.__lock:
+            if self.__model is None:
+                import google.generativeai as genai
+                genai.configure(api_key=self.__api_key or os.getenv("GEMINI_API_KEY"))
+                self.__model = genai.GenerativeModel(self.__model_name)
+                log.debug("Gemini client ready (%s)", self.__model_name)
+            return self.__model
+
+
+# Used unless a caller passes its own client
+client = GeminiClient()
+
+
+def tips_cache_key(course_context, model_name=MODEL_NAME):
+    """Content hash of a prompt's course data; the date only counts by day"""
+    payload = json.dumps([model_name, course_context], sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
 
-    current_date = datetime.now().strftime("%Y-%m-%d")
 
-    course_context = {
-        "course_name": course_name,
-        "current_date": current_date,
-        "assignments": [],
-        "modules": []
-    }
-
-    if assignments:
-        for a in assignments:
-            course_context["assignments"].append({
-                "title": a.get('assignment_name', 'Unknown'),
-                "due_date": a.get('due_at', 'No Date')
-            })
-
-    if modules:
-        for module in modules:
-            mod_data = {
-                "module_title": module.get("module_name", "General Module"),
-                "files": []
-            }
-            for f in module.get("files", []):
-                mod_data["files"].append(f.get("name", "Untitled File"))
-
-            course_context["modules"].append(mod_data)
-
-    context_json_str = json.dumps(course_context, indent=2)
-
-    prompt = (
-        f"You are a helpful tutor. I am giving you course data in JSON. **Today is {current_date}.**\n\n"
+def _study_tips_prompt(course_context):
+    context_json_str = compact_json(course_context)
+
+    return (
+        f"You are a helpful tutor. I am giving you course data in JSON. **Today is {course_context['current_date']}.**\n\n"
         f"Please provide a **short, concise response** (max 150 words) that includes:\n"
         f"1. **The Focus:** Identify the next upcoming assignment.\n"
         f"2. **Tutor Tip:** Give ONE key conceptual tip or insight related to that assignment's topic.\n"
@@ -50,8 +107,66 @@ def generate_study_tips(course_name, assignments, modules):
         f"Data:\n```json\n{context_json_str}\n```"
     )
 
+
+def _cached_tips(cache, key):
+    try:
+        return cache.get(key)
+    except Exception as e:
+        log.warning("Could not read study tips cache: %s", e)
+        return None
+
+
+def _store_tips(cache, key, course_name, tips):
+    try:
+        cache.put(key, course_name, tips)
+    except Exception as e:
+        log.warning("Could not write study tips cache: %s", e)
+
+
+def stream_study_tips(course_name, assignments, modules, cache=None, budget=None,
+                      cancelled=None, token_budget=CONTEXT_TOKEN_BUDGET, gemini=None):
+    """Yields study tips as Gemini generates them; raises if the request fails.
+
+    Cached tips come back as a single chunk. The full text is cached only when
+    the caller reads the stream to the end. With a RequestBudget, uncached
+    requests wait for a free slot, and yield nothing if `cancelled()` turns
+    true while waiting. The course data is packed into about `token_budget` tokens.
+    """
+    gemini = gemini or client
+    current_date = datetime.now().strftime("%Y-%m-%d")
+    course_context = build_course_context(course_name, assignments, modules, current_date,
+                                          token_budget)
+    key = tips_cache_key(course_context, gemini.model_name)
+    if cache is not None:
+        cached = _cached_tips(cache, key)
+        if cached is not None:
+            log.debug("Study tips for %s served from cache", course_name)
+            yield cached
+            return
+
+    if budget is not None and not budget.acquire(cancelled):
+        return
+
+    response = gemini.model().generate_content(_study_tips_prompt(course_context), stream=True)
+    parts = []
+    for chunk in response:
+        try:
+            text = chunk.text
+        except ValueError:
+            # Chunks without text parts, e.g. the final one carrying only the finish reason
+            continue
+        parts.append(text)
+        yield text
+
+    if cache is not None and parts:
+        _store_tips(cache, key, course_name, "".join(parts))
+
+
+def generate_study_tips(course_name, assignments, modules, cache=None,
+                        token_budget=CONTEXT_TOKEN_BUDGET):
+    """Study tips for one course; with a TipsCache, identical course data skips the API call"""
     try:
-        response = model.generate_content(prompt)
-        return response.text
+        return "".join(stream_study_tips(course_name, assignments, modules, cache=cache,
+                                         token_budget=token_budget))
     except Exception as e:
         return f"Error contacting Gemini: {str(e)}"
@@ -0,0 +1,76 @@
+"""Persistent cache of AI responses, keyed by a hash of the prompt's course data"""
+
+import time
+from sqlalchemy import (
+    create_engine, MetaData, Table, Column, String, Float, Text, select, delete, update, func
+)
+
+# Tips mention "today" and upcoming due dates, so they go stale within a day regardless
+TIPS_CACHE_TTL = 12 * 60 * 60
+TIPS_CACHE_MAX_ENTRIES = 200
+
+metadata = MetaData()
+
+ai_responses = Table(
+    "ai_responses", metadata,
+    Column("key", String, primary_key=True),
+    Column("course", String, nullable=False, index=True),
+    Column("created_at", Float, nullable=False),
+    Column("last_used", Float, nullable=False),
+    Column("response", Text, nullable=False),
+)
+
+
+class TipsCache:
+    """Stores one response per (course, content hash), with TTL and LRU eviction.
+
+    Storing a response for a course drops that course's older entries, since a
+    new hash means its assignments or modules changed.
+    """
+
+    def __init__(self, db_path, ttl=TIPS_CACHE_TTL, max_entries=TIPS_CACHE_MAX_ENTRIES):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.engine = create_engine(
+            f"sqlite:///{db_path}",
+            connect_args={"check_same_thread": False}
+        )
+        metadata.create_all(self.engine)
+
+    def get(self, key):
+        """Returns the cached response for `key`, or None if missing or expired."""
+        now = time.time()
+        with self.engine.begin() as conn:
+            row = conn.execute(
+                select(ai_responses.c.created_at, ai_responses.c.response)
+                .where(ai_responses.c.key == key)
+            ).first()
+            if row is None:
+                return None
+            if now - row.created_at >= self.ttl:
+                conn.execute(delete(ai_responses).where(ai_responses.c.key == key))
+                return None
+            conn.execute(
+                update(ai_responses).where(ai_responses.c.key == key).values(last_used=now))
+            return row.response
+
+    def put(self, key, course, response):
+        now = time.time()
+        with self.engine.begin() as conn:
+            conn.execute(delete(ai_responses).where(
+                (ai_responses.c.course == course) | (ai_responses.c.key == key)
+                | (ai_responses.c.created_at <= now - self.ttl)
+            ))
+            conn.execute(ai_responses.insert().values(
+                key=key, course=course, created_at=now, last_used=now, response=response))
+
+            count = conn.execute(select(func.count()).select_from(ai_responses)).scalar()
+            if count > self.max_entries:
+                oldest = (select(ai_responses.c.key)
+                          .order_by(ai_responses.c.last_used)
+                          .limit(count - self.max_entries))
+                conn.execute(delete(ai_responses).where(ai_responses.c.key.in_(oldest)))
+
+    def clear(self):
+        with self.engine.begin() as conn:
+            conn.execute(delete(ai_responses))
@@ -0,0 +1,212 @@
+import asyncio
+import json
+import random
+try:
+    import aiohttp
+    AIOHTTP_AVAILABLE = True
+except ImportError:
+    AIOHTTP_AVAILABLE = False
+
+from src.api.canvas_api import (
+    CanvasAPIError, MAX_PER_PAGE, MAX_IN_FLIGHT, MAX_RETRIES, BACKOFF_BASE, BACKOFF_MAX,
+    CONNECT_TIMEOUT, READ_TIMEOUT
+)
+from src.utils.data_transformer import canva_courses_with_grade, canvas_course_assignments, canvas_course_modules_and_files
+from src.utils.records import CourseRepository
+from src.utils.log import get_logger
+
+log = get_logger(__name__)
+
+
+class AsyncCanvasLMSAPI:
+    """asyncio counterpart of CanvasLMSAPI.
+
+    Every course x endpoint fetch runs on one event loop over one pooled
+    aiohttp session, bounded by a single semaphore instead of nested thread pools.
+    Use as `async with AsyncCanvasLMSAPI(token, url) as api: ...`.
+    """
+
+    def __init__(self, api_token, base_url, max_in_flight=MAX_IN_FLIGHT):
+        if not AIOHTTP_AVAILABLE:
+            raise RuntimeError("Install aiohttp to use the asyncio Canvas backend")
+        self.api_token = api_token
+        self.base_url = base_url
+        self.max_in_flight = max_in_flight
+        self.courses = []
+        self.http_session = None
+        self.__raw_courses = None
+        self.__semaphore = None
+        self.__courses_lock = None
+
+
+    async def __aenter__(self):
+        # Created here so they bind to the running event loop
+        self.__semaphore = asyncio.Semaphore(self.max_in_flight)
+        self.__courses_lock = asyncio.Lock()
+        self.http_session = aiohttp.ClientSession(
+            headers={
+                "Authorization": f"Bearer {self.api_token}",
+                "Accept": "application/json"
+            },
+            connector=aiohttp.TCPConnector(limit=self.max_in_flight),
+            timeout=aiohttp.ClientTimeout(sock_connect=CONNECT_TIMEOUT, sock_read=READ_TIMEOUT)
+        )
+        return self
+
+
+    async def __aexit__(self, *exc_info):
+        await self.http_session.close()
+
+
+    async def __canvas_api_request(self, url_path, params_additions=None):
+        """Returns every item of a list endpoint, following Link rel="next" headers.
+
+        Returns None if the first page failed, and raises CanvasAPIError if a later one did.
+        """
+        params = {
+            "user_id": "self",
+            "per_page": MAX_PER_PAGE
+        }
+        if params_additions:
+            params.update(params_additions)
+
+        items = []
+        url = f'{self.base_url}/{url_path}'
+        while url:
+            data, next_url = await self.__canvas_api_get(url, params)
+            if data is None:
+                if items:
+                    raise CanvasAPIError(f"Canvas stopped partway through {url_path}")
+                return None
+            if not isinstance(data, list):
+                return data
+            items.extend(data)
+            # The next link already carries the full query string
+            url, params = next_url, None
+        return items
+
+
+    async def __canvas_api_get(self, url, params=None):
+        """Fetches one page. Returns (data, next_url), or (None, None) on failure."""
+        query = None
+        if params:
+            query = [(k, str(v)) for k, values in params.items()
+                     for v in (values if isinstance(values, list) else [values])]
+
+        for attempt in range(MAX_RETRIES + 1):
+            try:
+                async with self.__semaphore:
+                    async with self.http_session.get(url, params=query) as response:
+                        status = response.status
+                        body = await response.text()
+                        retry_after = response.headers.get("Retry-After")
+                        next_link = response.links.get("next")
+                if status == 200:
+                    return json.loads(body), str(next_link["url"]) if next_link else None
+            except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                log.error("Network error: %s", e)
+                return None, None
+            except json.JSONDecodeError as e:
+                log.error("JSON parsing error from %s: %s", url, e)
+                return None, None
+
+            throttled = status == 429 or (status == 403 and "Rate Limit Exceeded" in body)
+            if not throttled and status < 500:
+                log.error("HTTP %s from %s", status, url)
+                log.debug("Response: %.500s", body)
+                return None, None
+            if attempt == MAX_RETRIES:
+                break
+
+            try:
+                delay = min(BACKOFF_MAX, max(0.0, float(retry_after)))
+            except (TypeError, ValueError):
+                delay = min(BACKOFF_MAX, BACKOFF_BASE * (2 ** attempt))
+                delay = random.uniform(delay / 2, delay)
+            log.debug("HTTP %s from %s, retrying in %.1fs", status, url, delay)
+            await asyncio.sleep(delay)
+
+        raise CanvasAPIError(
+            f"Canvas request failed after {MAX_RETRIES + 1} attempts (HTTP {status}): {url}")
+
+
+    async def __get_canvas_courses(self):
+        """Fetches the course catalog once; concurrent callers share the result."""
+        async with self.__courses_lock:
+            if self.__raw_courses is None:
+                params = {
+                    "enrollment_state": "active",
+                    "include": ["term", "total_scores"]
+                }
+                courses = await self.__canvas_api_request("courses", params)
+                if courses is None:
+                    raise CanvasAPIError(
+                        "Could not load the course catalog. "
+                        "Check your connection, CANVAS_BASE_URL and API_TOKEN in .env")
+                self.courses = [
+                    {"name": c["name"], "id": c["id"], "course_code": c.get("course_code")}
+                    for c in courses
+                ]
+                self.__raw_courses = courses
+        return self.__raw_courses
+
+
+    async def load_course_catalog(self):
+        """Returns the course list, fetching the catalog on first use."""
+        await self.__get_canvas_courses()
+        return self.courses
+
+
+    async def all_courses_and_grades(self):
+        return canva_courses_with_grade(await self.__get_canvas_courses())
+
+
+    async def fetch_course_assignments(self, course):
+        """Raises CanvasAPIError when Canvas keeps failing the course."""
+        params = {
+            "order_by": "due_at",
+            "bucket": "future"
+        }
+        raw_data = await self.__canvas_api_request(f"courses/{course['id']}/assignments", params)
+        return canvas_course_assignments(raw_data or [])
+
+
+    async def fetch_course_files(self, course):
+        """Raises CanvasAPIError when Canvas keeps failing the course."""
+        params = {
+            "include": "items"
+        }
+        raw_data = await self.__canvas_api_request(f"courses/{course['id']}/modules", params)
+        return canvas_course_modules_and_files(raw_data or [])
+
+
+    async def all_assignments(self):
+        """Returns {course id: [Assignment]} for every course that loaded."""
+        return await self.__all_courses(self.fetch_course_assignments)
+
+
+    async def all_files(self):
+        """Returns {course id: [Module]} for every course that loaded."""
+        return await self.__all_courses(self.fetch_course_files)
+
+
+    async def __all_courses(self, fetch):
+        courses = await self.load_course_catalog()
+        fetched = await asyncio.gather(*(fetch(c) for c in courses), return_exceptions=True)
+        results = {}
+        for course, records in zip(courses, fetched):
+            if isinstance(records, CanvasAPIError):
+                # Left out rather than shown as a course with nothing in it
+                log.error("Course %s: %s", course["id"], records)
+                continue
+            if isinstance(records, BaseException):
+                raise records
+            results[course["id"]] = records
+        return results
+
+
+    async def load_all(self):
+        """Returns a CourseRepository with everything, fetched concurrently."""
+        courses, assignments, files = await asyncio.gather(
+            self.all_courses_and_grades(), self.all_assignments(), self.all_files())
+        return CourseRepository(courses, assignments, files)
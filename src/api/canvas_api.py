@@ -1,102 +1,584 @@
 import requests
+import codecs
 import json
-from src.utils.data_transformer import canva_courses_with_grade, canvas_course_assignments, canvas_course_modules_and_files
+import random
+import threading
+import time
+from requests.adapters import HTTPAdapter
+from urllib.parse import urlparse, parse_qs, urlencode, urlunparse
+from src.utils.log import get_logger
+from src.api.response_cache import MISS, token_identity
+from src.utils.data_transformer import canva_courses_with_grade, canvas_course_assignments, canvas_module, merge_updated_records
 from concurrent.futures import ThreadPoolExecutor
 
+log = get_logger(__name__)
+
+# Canvas caps per_page at 100 on its list endpoints
+MAX_PER_PAGE = 100
+# Upper bound on threads used to prefetch the remaining pages of one endpoint
+PAGE_PREFETCH_WORKERS = 4
+# Threads used for the per-course fan-out in all_assignments / all_files
+MAX_WORKERS = 8
+# Seconds allowed for the TCP/TLS handshake and for each response read
+CONNECT_TIMEOUT = 5
+READ_TIMEOUT = 30
+# Hard cap on requests in flight per token, across every thread pool
+MAX_IN_FLIGHT = 12
+# Canvas charges each in-flight request this many units up front
+PREFLIGHT_COST = 50
+# Bucket units kept in reserve before concurrency drops to a single request
+RATE_LIMIT_RESERVE = 100
+MAX_RETRIES = 5
+BACKOFF_BASE = 0.5
+BACKOFF_MAX = 30
+# Bytes read per chunk when a response body is decoded as it streams in
+STREAM_CHUNK_SIZE = 64 * 1024
+
+# Returned in place of a page when a conditional request answers 304
+NOT_MODIFIED = object()
+
+
+class CanvasAPIError(Exception):
+    """Raised when Canvas keeps throttling or failing a request after every retry."""
+
+
+class CanvasRequestScheduler:
+    """Routes every Canvas request through one adaptive concurrency limit.
+
+    Canvas meters each token with a leaky bucket and reports what is left in
+    X-Rate-Limit-Remaining. The limit widens while the bucket is healthy and
+    narrows as it drains; throttled and 5xx responses are retried with
+    jittered exponential backoff.
+    """
+
+    def __init__(self, max_in_flight=MAX_IN_FLIGHT, max_retries=MAX_RETRIES):
+        self.max_in_flight = max_in_flight
+        self.max_retries = max_retries
+        self.limit = max_in_flight
+        self.in_flight = 0
+        self.remaining = None
+        self.cost = None
+        self.__cond = threading.Condition()
+
+    def get(self, session, url, **kwargs):
+        """Performs a GET once a slot is free, retrying throttled and 5xx replies."""
+        for attempt in range(self.max_retries + 1):
+            self.__acquire()
+            try:
+                response = session.get(url, **kwargs)
+            finally:
+                self.__release()
+
+            self.__observe(response)
+            throttled = self.__is_throttled(response)
+            if not throttled and response.status_code < 500:
+                return response
+
+            if throttled:
+                with self.__cond:
+                    self.limit = 1
+            if attempt == self.max_retries:
+                break
+            delay = self.__backoff(attempt, response)
+            log.debug("HTTP %s from %s, retrying in %.1fs", response.status_code, url, delay)
+            # Hand the connection back even if the body was streamed and never read
+            response.close()
+            time.sleep(delay)
+
+        raise CanvasAPIError(
+            f"Canvas request failed after {self.max_retries + 1} attempts "
+            f"(HTTP {response.status_code}): {url}")
+
+    def __acquire(self):
+        with self.__cond:
+            while self.in_flight >= self.limit:
+                self.__cond.wait()
+            self.in_flight += 1
+
+    def __release(self):
+        with self.__cond:
+            self.in_flight -= 1
+            self.__cond.notify_all()
+
+    def __observe(self, response):
+        remaining = _float_header(response, "X-Rate-Limit-Remaining")
+        cost = _float_header(response, "X-Request-Cost")
+        if remaining is None:
+            return
+        with self.__cond:
+            self.remaining = remaining
+            if cost is not None:
+                self.cost = cost
+            per_request = PREFLIGHT_COST + (self.cost or 0)
+            headroom = remaining - RATE_LIMIT_RESERVE
+            self.limit = max(1, min(self.max_in_flight, int(headroom // per_request)))
+            self.__cond.notify_all()
+
+    @staticmethod
+    def __is_throttled(response):
+        if response.status_code == 429:
+            return True
+        return response.status_code == 403 and "Rate Limit Exceeded" in response.text
+
+    @staticmethod
+    def __backoff(attempt, response):
+        retry_after = _float_header(response, "Retry-After")
+        if retry_after is not None:
+            return min(BACKOFF_MAX, max(0.0, retry_after))
+        delay = min(BACKOFF_MAX, BACKOFF_BASE * (2 ** attempt))
+        return random.uniform(delay / 2, delay)
+
+
+def _float_header(response, name):
+    try:
+        return float(response.headers[name])
+    except (KeyError, ValueError):
+        return None
+
+
+def iter_json_array(chunks):
+    """Yields the elements of a JSON array as they arrive, from an iterable of byte chunks.
+
+    Only the undecoded tail of the body is buffered, never the whole array.
+    Raises ValueError (JSONDecodeError) when the body isn't a well-formed array.
+    """
+    decoder = json.JSONDecoder()
+    text = codecs.getincrementaldecoder("utf-8")()
+    chunks = iter(chunks)
+    buffer = ""
+    pos = 0
+    started = False
+    exhausted = False
+
+    while True:
+        # Skip whitespace and the separators between elements
+        while pos < len(buffer) and buffer[pos] in " \t\r\n,":
+            pos += 1
+        if pos < len(buffer):
+            if not started:
+                if buffer[pos] != "[":
+                    raise json.JSONDecodeError("Expected a JSON array", buffer, pos)
+                started = True
+                pos += 1
+                continue
+            if buffer[pos] == "]":
+                return
+            try:
+                item, end = decoder.raw_decode(buffer, pos)
+                # Numbers can decode from a prefix ("1.5" of "1.5e3"), so only trust
+                # a value once the delimiter after it has arrived
+                if exhausted or (end < len(buffer) and buffer[end] in " \t\r\n,]"):
+                    yield item
+                    pos = end
+                    continue
+            except json.JSONDecodeError:
+                if exhausted:
+                    raise
+        elif exhausted:
+            raise json.JSONDecodeError("Unterminated JSON array", buffer, pos)
+
+        chunk = next(chunks, None)
+        if chunk is None:
+            exhausted = True
+            buffer = buffer[pos:] + text.decode(b"", final=True)
+        else:
+            buffer = buffer[pos:] + text.decode(chunk)
+        pos = 0
+
+
+class StreamedPage:
+    """One page of a list endpoint, decoded and normalized item by item while it downloads.
+
+    Iterate it once. Raises CanvasAPIError if the body breaks off or isn't valid
+    JSON, so a truncated page never passes for a shorter list.
+    """
+
+    def __init__(self, response, transform):
+        self.response = response
+        self.transform = transform
+
+    def __iter__(self):
+        try:
+            for item in iter_json_array(self.response.iter_content(STREAM_CHUNK_SIZE)):
+                yield self.transform(item)
+        except (requests.exceptions.RequestException, ValueError) as e:
+            raise CanvasAPIError(f"Streaming {self.response.url} failed: {e}") from e
+        finally:
+            self.response.close()
+
+    def close(self):
+        """Releases the connection of a page that won't be iterated."""
+        self.response.close()
+
+
+def new_canvas_session(pool_size=MAX_WORKERS * 2):
+    """Creates a keep-alive session with a connection pool sized for the fetch workers.
+
+    The default covers all_assignments and all_files fanning out at the same time.
+    """
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    session.headers.update({
+        "Accept": "application/json",
+        "Content-Type": "application/json"
+    })
+    return session
+
 
 class CanvasLMSAPI:
-    def __init__(self, api_token, base_url):
+    def __init__(self, api_token, base_url, session=None, scheduler=None, cache=None):
         self.api_token = api_token
         self.base_url = base_url
+        # Shared across every fetch so connections are reused instead of re-handshaking
+        self.session = session or new_canvas_session()
+        self.headers = {"Authorization": f"Bearer {self.api_token}"}
+        # Every fetch, from any thread pool, goes through this rate-limit-aware gate
+        self.scheduler = scheduler or CanvasRequestScheduler()
+        # ETag / Last-Modified per endpoint, used for conditional (delta) requests
+        self.validators = {}
+        # Optional ResponseCache; keys are scoped to this token and Canvas instance
+        self.cache = cache
+        self.__cache_prefix = f"{token_identity(api_token)}|{base_url}/"
         self.courses = []
-        self.__init_course()
+        self.courses_by_id = {}
+        self.__raw_courses = None
+        self.__catalog_lock = threading.Lock()
+
+
+    def load_course_catalog(self, refresh=False):
+        """Returns the course list, fetching the catalog on first use (or when refresh=True).
 
+        Concurrent callers share a single fetch.
+        """
+        with self.__catalog_lock:
+            if refresh:
+                self.invalidate_cache("courses?")
+            if refresh or self.__raw_courses is None:
+                self.__load_course_catalog()
+        return self.courses
 
-    def __init_course(self):
-        """Initializes the list of courses. Handles errors gracefully."""
+
+    def invalidate_cache(self, path=""):
+        """Drops cached responses for endpoints starting with `path`, e.g. "courses/42/"."""
+        if self.cache is not None:
+            self.cache.invalidate(self.__cache_prefix + path)
+
+
+    def __load_course_catalog(self):
+        """Fetches /courses once, with terms and scores, for both the course list and the grades.
+
+        Raises CanvasAPIError if Canvas can't be reached, so a failed sync isn't
+        mistaken for an account with no courses.
+        """
         path = "courses"
         params = {
             "enrollment_state": "active",
-            "include": ["term"],
-            "per_page": 10
+            "include": ["term", "total_scores"]
         }
-        courses = self.__canvas_api_request(path, params_additions=params, reason="init")
+        courses = self.__canvas_api_request(path, params_additions=params, reason="courses")
 
+        if courses is None:
+            raise CanvasAPIError(
+                "Could not load the course catalog. "
+                "Check your connection, CANVAS_BASE_URL and API_TOKEN in .env")
         if not courses:
-            print("⚠️  WARNING: No courses found or API request failed.")
-            print("Check your CANVAS_BASE_URL and API_TOKEN in .env")
-            return
+            log.warning("No courses found. Check your CANVAS_BASE_URL and API_TOKEN in .env")
 
-        for course in courses:
-            self.courses.append({"name": course["name"], "id": course["id"], "course_code": course["course_code"]})
+        self.__raw_courses = courses
+        self.courses = [
+            {"name": course["name"], "id": course["id"], "course_code": course.get("course_code")}
+            for course in courses
+        ]
+        self.courses_by_id = {course["id"]: course for course in self.courses}
 
 
-    def __canvas_api_request(self, url_path, params_additions=0, reason="data"):
-        headers = {
-            "Authorization": f"Bearer {self.api_token}",
-            "Content-Type": "application/json"
-        }
+    def __canvas_api_request(self, url_path, params_additions=0, reason="data", incremental=False,
+                             transform=None):
+        """Returns every item of a list endpoint, or None if the first page failed.
+
+        With incremental=True, returns NOT_MODIFIED when Canvas confirms nothing changed.
+        With a `transform`, pages are streamed and only its results are kept.
+        Results are cached for the TTL of `reason` when a cache is set.
+
+        Raises CanvasAPIError when a later page fails or a streamed page breaks
+        off: a partial list would read as records deleted on Canvas.
+        """
+        cache_key = None
+        if self.cache is not None:
+            endpoint = self.__endpoint_key(url_path, self.__request_params(params_additions))
+            cache_key = f"{self.__cache_prefix}{endpoint}|{getattr(transform, '__name__', '')}"
+            cached = self.cache.get(cache_key, reason)
+            if cached is not MISS:
+                return cached
+
+        outcome = {}
+        pages = self.__canvas_api_pages(url_path, params_additions, reason, incremental, transform,
+                                        outcome)
+        first = next(pages, None)
+        if first is None:
+            return None
+        if first is NOT_MODIFIED:
+            return first
+        if isinstance(first, dict):
+            items = first
+        else:
+            items = list(first)
+            for page in pages:
+                items.extend(page)
+
+        if not outcome.get("complete"):
+            raise CanvasAPIError(f"Canvas stopped partway through {url_path}")
+        if cache_key is not None:
+            self.cache.put(cache_key, items, persist=transform is None)
+        return items
+
+
+    def paginate(self, url_path, params_additions=0, reason="data", transform=None):
+        """Yields the items of a list endpoint page by page, following Link headers.
+
+        With a `transform`, each page is decoded as it streams in and the
+        transformed items are yielded without building the page in memory.
+        Nothing is yielded if the first page fails; a later page failing raises
+        CanvasAPIError after the items before it. Results are never cached.
+        """
+        outcome = {}
+        started = False
+        for page in self.__canvas_api_pages(url_path, params_additions, reason,
+                                            transform=transform, outcome=outcome):
+            started = True
+            if isinstance(page, dict):
+                yield page
+            else:
+                yield from page
+        if started and not outcome.get("complete"):
+            raise CanvasAPIError(f"Canvas stopped partway through {url_path}")
+
+
+    @staticmethod
+    def __request_params(params_additions):
         params = {
-            "user_id": "self"
+            "user_id": "self",
+            "per_page": MAX_PER_PAGE
         }
         if params_additions:
             params.update(params_additions)
+        return params
+
+
+    def __canvas_api_pages(self, url_path, params_additions=0, reason="data", incremental=False,
+                           transform=None, outcome=None):
+        """Yields each page of a list endpoint; sets outcome["complete"] once all arrived."""
+        params = self.__request_params(params_additions)
         full_path = f'{self.base_url}/{url_path}'
+
+        # Only single-page endpoints are revalidated: a 304 on page 1 says nothing
+        # about later pages, and their bodies aren't kept around to reuse.
+        key = self.__endpoint_key(url_path, params)
+        stored = self.validators.get(key)
+        conditional = None
+        if incremental and stored and stored.get("pages") == 1:
+            conditional = {}
+            if stored.get("etag"):
+                conditional["If-None-Match"] = stored["etag"]
+            if stored.get("last_modified"):
+                conditional["If-Modified-Since"] = stored["last_modified"]
+
+        data, response = self.__canvas_api_get(full_path, params, conditional, transform)
+        if data is None:
+            return
         try:
-            # if reason != "init":
-            #     print(f"Fetching {reason} from Canvas...")
-            response = requests.get(full_path, headers=headers, params=params)
+            yield data
+        finally:
+            # Releases the connection if the consumer stopped before reading the page
+            if isinstance(data, StreamedPage):
+                data.close()
+        if data is NOT_MODIFIED:
+            log.debug("%s (%s): not modified", url_path, reason)
+            if outcome is not None:
+                outcome["complete"] = True
+            return
+
+        page_count = 1
+        for data in self.__canvas_api_next_pages(response.links, transform):
+            if data is None:
+                return
+            page_count += 1
+            yield data
+        log.debug("%s (%s): %d page(s)", url_path, reason, page_count)
+        if outcome is not None:
+            outcome["complete"] = True
+
+        etag = response.headers.get("ETag")
+        last_modified = response.headers.get("Last-Modified")
+        if etag or last_modified:
+            self.validators[key] = {
+                "etag": etag,
+                "last_modified": last_modified,
+                "pages": page_count
+            }
+
+
+    @staticmethod
+    def __endpoint_key(url_path, params):
+        query = urlencode(sorted(params.items()), doseq=True)
+        return f"{url_path}?{query}"
+
+
+    def __canvas_api_next_pages(self, links, transform=None):
+        """Yields the pages after the first one, or None once a page fails."""
+        next_url = links.get("next", {}).get("url")
+        if not next_url:
+            return
+
+        # Canvas only reports rel="last" when the page count is cheap to compute;
+        # when it does, fetch the remaining numbered pages ahead of time.
+        page_urls = self.__remaining_page_urls(next_url, links.get("last", {}).get("url"))
+        if page_urls and transform is not None:
+            yield from self.__canvas_api_streamed_pages(page_urls, transform)
+            return
+        if page_urls:
+            workers = min(len(page_urls), PAGE_PREFETCH_WORKERS)
+            with ThreadPoolExecutor(max_workers=workers) as executor:
+                futures = [executor.submit(self.__canvas_api_get, url, None, None, transform)
+                           for url in page_urls]
+                for future in futures:
+                    data, _ = future.result()
+                    yield data
+                    if data is None:
+                        return
+            return
+
+        while next_url:
+            data, response = self.__canvas_api_get(next_url, transform=transform)
+            yield data
+            if data is None:
+                return
+            next_url = response.links.get("next", {}).get("url")
+
+
+    def __canvas_api_streamed_pages(self, page_urls, transform):
+        """Yields numbered streamed pages, requesting only one page ahead of the consumer.
+
+        A streamed page holds its connection until it is read, so fetching every
+        page at once would park the whole list's bodies on open sockets.
+        """
+        with ThreadPoolExecutor(max_workers=1) as executor:
+            ahead = executor.submit(self.__canvas_api_get, page_urls[0], None, None, transform)
+            data = None
+            try:
+                for i in range(len(page_urls)):
+                    data, _ = ahead.result()
+                    ahead = None
+                    if data is None:
+                        yield None
+                        return
+                    if i + 1 < len(page_urls):
+                        ahead = executor.submit(
+                            self.__canvas_api_get, page_urls[i + 1], None, None, transform)
+                    yield data
+            finally:
+                # The consumer stopped early: release the page it didn't read and the one ahead
+                if isinstance(data, StreamedPage):
+                    data.close()
+                if ahead is not None:
+                    ahead.add_done_callback(self.__close_streamed_page)
+
+
+    @staticmethod
+    def __close_streamed_page(future):
+        if not future.cancelled() and future.exception() is None:
+            data, _ = future.result()
+            if isinstance(data, StreamedPage):
+                data.close()
+
+
+    @staticmethod
+    def __remaining_page_urls(next_url, last_url):
+        """Builds the URLs for pages next..last, or [] if the pages aren't numbered."""
+        if not last_url:
+            return []
+        next_parts = urlparse(next_url)
+        next_query = parse_qs(next_parts.query)
+        next_page = next_query.get("page", [""])[0]
+        last_page = parse_qs(urlparse(last_url).query).get("page", [""])[0]
+        if not (next_page.isdigit() and last_page.isdigit()):
+            return []
+
+        urls = []
+        for page in range(int(next_page), int(last_page) + 1):
+            next_query["page"] = [str(page)]
+            urls.append(urlunparse(next_parts._replace(query=urlencode(next_query, doseq=True))))
+        return urls
+
+
+    def __canvas_api_get(self, full_path, params=None, conditional=None, transform=None):
+        """Fetches a single page. Returns (data, response), or (None, None) on failure.
+
+        `conditional` holds If-None-Match / If-Modified-Since headers; a 304 reply
+        comes back as (NOT_MODIFIED, response). With a `transform`, the body is
+        left unread and data is a StreamedPage that decodes it on iteration.
+
+        Raises CanvasAPIError when Canvas is still throttling after every retry,
+        so a rate-limited course never masquerades as an empty one.
+        """
+        headers = self.headers
+        if conditional:
+            headers = {**self.headers, **conditional}
+        try:
+            response = self.scheduler.get(self.session, full_path, headers=headers, params=params,
+                                          timeout=(CONNECT_TIMEOUT, READ_TIMEOUT),
+                                          stream=transform is not None)
             # Check if request was successful
+            if response.status_code == 304:
+                return NOT_MODIFIED, response
             if response.status_code == 200:
+                if transform is not None:
+                    return StreamedPage(response, transform), response
                 data = response.json()
-                return data
+                return data, response
             else:
-                print(f"Error: HTTP {response.status_code}")
-                print(f"Response: {response.text}")
-                return None
+                log.error("HTTP %s from %s", response.status_code, full_path)
+                log.debug("Response: %.500s", response.text)
+                return None, None
 
         except requests.exceptions.RequestException as e:
-            print(f"Network error: {e}")
-            return None
+            log.error("Network error: %s", e)
+            return None, None
         except json.JSONDecodeError as e:
-            print(f"JSON parsing error: {e}")
-            return None
+            log.error("JSON parsing error from %s: %s", full_path, e)
+            return None, None
 
 
-    def __get_canvas_courses(self):
-        path = "courses"
-        params = {
-            "enrollment_state": "active",
-            "include": ["term", "total_scores"],
-            "per_page": 10
-        }
-        courses = self.__canvas_api_request(path, params_additions=params, reason="courses")
-        if not courses: return [] # Return empty list if failed
+    def __get_course_assignments(self, course_id, incremental=False):
+        path, params = self.__course_assignments_endpoint(course_id)
+        return self.__canvas_api_request(path, params_additions=params, reason="assignments",
+                                         incremental=incremental)
+
 
-        for course in courses:
-            # Avoid duplicates if logic runs multiple times
-            if not any(c['id'] == course['id'] for c in self.courses):
-                self.courses.append({"name": course["name"], "id": course["id"]})
-        return courses
+    def __get_course_files(self, course_id, incremental=False):
+        """Module records, normalized while the (potentially huge) pages stream in."""
+        path, params = self.__course_files_endpoint(course_id)
+        return self.__canvas_api_request(path, params_additions=params, reason="files",
+                                         incremental=incremental, transform=canvas_module)
 
 
-    def __get_course_assignments(self, course_id):
-        path = f"courses/{course_id}/assignments"
+    @staticmethod
+    def __course_assignments_endpoint(course_id):
         params = {
             "order_by": "due_at",
             "bucket": "future"
         }
-        assignments = self.__canvas_api_request(path, params_additions=params, reason="assignments")
-        return assignments
+        return f"courses/{course_id}/assignments", params
 
 
-    def __get_course_files(self, course_id):
-        path = f"courses/{course_id}/modules"
+    @staticmethod
+    def __course_files_endpoint(course_id):
         params = {
             "include": "items"
         }
-        modules = self.__canvas_api_request(path,params_additions=params, reason="files")
-        return modules
+        return f"courses/{course_id}/modules", params
 
     # def get_announcements(self):
     #     path = "announcements"
@@ -110,32 +592,110 @@ class CanvasLMSAPI:
     #     annoucements = self.__canvas_api_request(url_path=path, reason=path, params_additions=params)
     #     return annoucements
 
-    def all_courses_and_grades(self):
-        return canva_courses_with_grade(self.__get_canvas_courses())
+    def all_courses_and_grades(self, refresh=False):
+        """Grades from the course catalog; refresh=True re-fetches it first."""
+        self.load_course_catalog(refresh)
+        return canva_courses_with_grade(self.__raw_courses)
 
 
-    def all_assignments(self):
-        def fetch_for_course(course):
-            raw_data = self.__get_course_assignments(course["id"])
-            if raw_data is None:
-                return {"course_name": course["name"], "assignments": []}
-            return canvas_course_assignments(raw_data, course["name"])
+    def fetch_course_assignments(self, course, previous=None):
+        """Fetches one course's assignments. Returns (assignments, changed).
+
+        With the `previous` list the request is conditional: a 304 keeps it as-is,
+        and records whose updated_at hasn't moved are carried over. Raises
+        CanvasAPIError when Canvas keeps failing the course, so callers can keep
+        what they had instead of showing it as empty.
+        """
+        if previous is None:
+            raw_data = self.__get_course_assignments(course["id"]) or []
+            return canvas_course_assignments(raw_data), True
+
+        raw_data = self.__get_course_assignments(course["id"], incremental=True)
+        if raw_data is NOT_MODIFIED or raw_data is None:
+            # Unchanged, or a failed refresh: keep what we already have
+            return previous, False
+        return merge_updated_records(previous, canvas_course_assignments(raw_data))
+
+
+    def fetch_course_files(self, course, previous=None):
+        """Fetches one course's modules and items. Returns (modules, changed).
+
+        Raises CanvasAPIError like fetch_course_assignments.
+        """
+        if previous is None:
+            return self.__get_course_files(course["id"]) or [], True
+
+        fresh = self.__get_course_files(course["id"], incremental=True)
+        if fresh is NOT_MODIFIED or fresh is None:
+            return previous, False
+        return fresh, fresh != previous
+
 
-        with ThreadPoolExecutor() as executor:
-            results = list(executor.map(fetch_for_course, self.courses))
+    def iter_course_assignments(self, course):
+        """Yields one course's assignments as their pages arrive."""
+        path, params = self.__course_assignments_endpoint(course["id"])
+        for raw in self.paginate(path, params, reason="assignments"):
+            yield from canvas_course_assignments([raw])
 
-        return results
+
+    def iter_course_files(self, course):
+        """Yields one course's modules as their pages stream in."""
+        path, params = self.__course_files_endpoint(course["id"])
+        yield from self.paginate(path, params, reason="files", transform=canvas_module)
+
+
+    def all_assignments(self):
+        """Returns {course id: [Assignment]} for every course."""
+        return self.sync_assignments({})[0]
 
 
     def all_files(self):
-        def fetch_for_course(course):
-            raw_data = self.__get_course_files(course["id"])
-            if raw_data is None:
-                return {course["name"]: []}
-            return canvas_course_modules_and_files(raw_data, course["name"])
+        """Returns {course id: [Module]} for every course."""
+        return self.sync_files({})[0]
+
+
+    def sync_assignments(self, previous):
+        """Refreshes a previous all_assignments() result with conditional requests.
 
-        with ThreadPoolExecutor() as executor:
-            results = list(executor.map(fetch_for_course, self.courses))
+        Returns (results, ids of the courses that changed, ids of the courses that failed).
+        """
+        return self.__sync_courses(self.fetch_course_assignments, previous)
+
+
+    def sync_files(self, previous):
+        """Refreshes a previous all_files() result with conditional requests.
+
+        Returns (results, ids of the courses that changed, ids of the courses that failed).
+        """
+        return self.__sync_courses(self.fetch_course_files, previous)
+
+
+    def __sync_courses(self, fetch, previous):
+        courses = self.load_course_catalog()
+
+        def fetch_for_course(course):
+            try:
+                return fetch(course, previous.get(course["id"]))
+            except CanvasAPIError as e:
+                log.error("Course %s: %s", course["id"], e)
+                return e
 
-        return results
+        with ThreadPoolExecutor(max_workers=MAX_WORKERS) as executor:
+            fetched = list(executor.map(fetch_for_course, courses))
 
+        results = {}
+        changed = []
+        failed = []
+        for course, outcome in zip(courses, fetched):
+            course_id = course["id"]
+            if isinstance(outcome, CanvasAPIError):
+                failed.append(course_id)
+                # Keep the last good records; a course never loaded stays out rather than empty
+                if course_id in previous:
+                    results[course_id] = previous[course_id]
+                continue
+            records, was_changed = outcome
+            results[course_id] = records
+            if was_changed:
+                changed.append(course_id)
+        return results, changed, failed
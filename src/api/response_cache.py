@@ -0,0 +1,134 @@
+"""Response cache for Canvas GETs: an in-memory LRU with an optional SQLite tier"""
+
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+from src.utils.log import get_logger
+
+log = get_logger(__name__)
+
+# Seconds a cached response stays fresh, per kind of request; kept below the
+# auto-refresh intervals so a scheduled refresh always reaches Canvas
+DEFAULT_CACHE_TTLS = {
+    "courses": 60,
+    "assignments": 120,
+    "files": 600,
+}
+DEFAULT_CACHE_TTL = 60
+# Entries kept in memory (one per endpoint + params) and on disk
+MAX_MEMORY_ENTRIES = 512
+MAX_DISK_ENTRIES = 2048
+
+# Returned by ResponseCache.get when there's no fresh entry
+MISS = object()
+
+
+def token_identity(api_token):
+    """Short, one-way fingerprint of a token, so cache keys never hold the token itself"""
+    return hashlib.sha256(api_token.encode("utf-8")).hexdigest()[:16]
+
+
+class ResponseCache:
+    """Caches decoded Canvas responses by key, with a TTL per request kind.
+
+    The memory tier is an LRU bounded by `max_entries`. With `disk_path`, JSON-
+    serializable values are also written to SQLite so they survive restarts.
+    Safe to share between threads and between CanvasLMSAPI instances: callers
+    put the token identity in the key.
+    """
+
+    def __init__(self, max_entries=MAX_MEMORY_ENTRIES, ttls=None, disk_path=None,
+                 max_disk_entries=MAX_DISK_ENTRIES):
+        self.max_entries = max_entries
+        self.ttls = {**DEFAULT_CACHE_TTLS, **(ttls or {})}
+        self.max_disk_entries = max_disk_entries
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.__entries = OrderedDict()  # key -> (stored_at, value)
+        self.__lock = threading.Lock()
+        self.__db = None
+        if disk_path:
+            self.__db = sqlite3.connect(str(disk_path), check_same_thread=False)
+            self.__db.execute(
+                "CREATE TABLE IF NOT EXISTS responses ("
+                "key TEXT PRIMARY KEY, stored_at REAL NOT NULL, payload TEXT NOT NULL)")
+            self.__db.commit()
+
+    def get(self, key, kind):
+        """Returns the cached value for `key` if it's younger than `kind`'s TTL, else MISS"""
+        ttl = self.ttls.get(kind, DEFAULT_CACHE_TTL)
+        now = time.time()
+        with self.__lock:
+            entry = self.__entries.get(key)
+            if entry is not None:
+                if now - entry[0] < ttl:
+                    self.__entries.move_to_end(key)
+                    self.hits += 1
+                    return entry[1]
+                del self.__entries[key]
+
+            if self.__db is not None:
+                row = self.__db.execute(
+                    "SELECT stored_at, payload FROM responses WHERE key = ?", (key,)).fetchone()
+                if row is not None and now - row[0] < ttl:
+                    value = json.loads(row[1])
+                    self.__remember(key, row[0], value)
+                    self.disk_hits += 1
+                    return value
+
+            self.misses += 1
+            return MISS
+
+    def put(self, key, value, persist=True):
+        """Stores `value`; persist=False keeps it in memory only (e.g. non-JSON records)"""
+        now = time.time()
+        with self.__lock:
+            self.__remember(key, now, value)
+            if persist and self.__db is not None:
+                try:
+                    payload = json.dumps(value)
+                except (TypeError, ValueError):
+                    return
+                self.__db.execute(
+                    "INSERT OR REPLACE INTO responses (key, stored_at, payload) VALUES (?, ?, ?)",
+                    (key, now, payload))
+                self.__db.execute(
+                    "DELETE FROM responses WHERE key NOT IN "
+                    "(SELECT key FROM responses ORDER BY stored_at DESC LIMIT ?)",
+                    (self.max_disk_entries,))
+                self.__db.commit()
+
+    def invalidate(self, prefix=""):
+        """Drops every entry whose key starts with `prefix` (everything by default)"""
+        with self.__lock:
+            for key in [k for k in self.__entries if k.startswith(prefix)]:
+                del self.__entries[key]
+            if self.__db is not None:
+                escaped = prefix.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+                self.__db.execute(
+                    "DELETE FROM responses WHERE key LIKE ? ESCAPE '\\'", (escaped + "%",))
+                self.__db.commit()
+        log.debug("Invalidated cached responses under %r", prefix)
+
+    def stats(self):
+        with self.__lock:
+            return {
+                "hits": self.hits,
+                "disk_hits": self.disk_hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "entries": len(self.__entries),
+            }
+
+    def __remember(self, key, stored_at, value):
+        self.__entries[key] = (stored_at, value)
+        self.__entries.move_to_end(key)
+        while len(self.__entries) > self.max_entries:
+            self.__entries.popitem(last=False)
+            self.evictions += 1
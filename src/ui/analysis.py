@@ -2,34 +2,109 @@ from PySide6.QtWidgets import (
     QWidget, QVBoxLayout, QLabel, QPushButton, QScrollArea,
     QTextEdit, QFrame
 )
-from PySide6.QtGui import QFont
+from PySide6.QtGui import QFont, QTextCursor
 from PySide6.QtCore import Qt, QThread, Signal
-from src.ai.gemini import generate_study_tips
+import concurrent.futures
+from src.ai.gemini import stream_study_tips, RequestBudget, BATCH_CONCURRENCY, REQUESTS_PER_MINUTE
+from src.ai.context import CONTEXT_TOKEN_BUDGET
 
 class AnalysisWorker(QThread):
-    finished = Signal(str)
+    """Streams study tips for one course; stop it with requestInterruption()"""
+    chunk = Signal(str)
+    tips_ready = Signal(str)  # the complete text
     error = Signal(str)
 
-    def __init__(self, course_name, assignments, modules):
+    def __init__(self, course_name, assignments, modules, cache=None, budget=None,
+                 token_budget=CONTEXT_TOKEN_BUDGET):
         super().__init__()
         self.course_name = course_name
         self.assignments = assignments
         self.modules = modules
+        self.cache = cache
+        self.budget = budget
+        self.token_budget = token_budget
 
     def run(self):
+        parts = []
         try:
-            tips = generate_study_tips(self.course_name, self.assignments, self.modules)
-            self.finished.emit(tips)
+            for text in stream_study_tips(self.course_name, self.assignments, self.modules,
+                                          cache=self.cache, budget=self.budget,
+                                          cancelled=self.isInterruptionRequested,
+                                          token_budget=self.token_budget):
+                if self.isInterruptionRequested():
+                    return
+                parts.append(text)
+                self.chunk.emit(text)
         except Exception as e:
-            self.error.emit(str(e))
+            if not self.isInterruptionRequested():
+                self.error.emit(str(e))
+            return
+        if not self.isInterruptionRequested():
+            self.tips_ready.emit("".join(parts))
+
+class BatchAnalysisWorker(QThread):
+    """Generates tips for many courses on a bounded pool, emitting each as it completes"""
+    course_done = Signal(object, str)  # course id, tips
+    course_failed = Signal(object, str)  # course id, error
+
+    def __init__(self, jobs, cache=None, budget=None, concurrency=BATCH_CONCURRENCY,
+                 token_budget=CONTEXT_TOKEN_BUDGET):
+        super().__init__()
+        # (course id, course name, assignments, modules)
+        self.jobs = jobs
+        self.cache = cache
+        self.budget = budget
+        self.concurrency = concurrency
+        self.token_budget = token_budget
+
+    def run(self):
+        with concurrent.futures.ThreadPoolExecutor(max_workers=self.concurrency) as executor:
+            futures = {
+                executor.submit(self.__generate, name, assignments, modules): course_id
+                for course_id, name, assignments, modules in self.jobs
+            }
+            for future in concurrent.futures.as_completed(futures):
+                if self.isInterruptionRequested():
+                    executor.shutdown(wait=False, cancel_futures=True)
+                    return
+                course_id = futures[future]
+                try:
+                    tips = future.result()
+                except Exception as e:
+                    self.course_failed.emit(course_id, str(e))
+                    continue
+                self.course_done.emit(course_id, tips)
+
+    def __generate(self, name, assignments, modules):
+        parts = []
+        if self.isInterruptionRequested():
+            return ""
+        for text in stream_study_tips(name, assignments, modules, cache=self.cache,
+                                      budget=self.budget,
+                                      cancelled=self.isInterruptionRequested,
+                                      token_budget=self.token_budget):
+            if self.isInterruptionRequested():
+                break
+            parts.append(text)
+        return "".join(parts)
 
 class AnalysisPage(QWidget):
-    def __init__(self, courses, assignments, files):
+    def __init__(self, data, tips_cache=None, concurrency=BATCH_CONCURRENCY,
+                 requests_per_minute=REQUESTS_PER_MINUTE, context_tokens=CONTEXT_TOKEN_BUDGET):
         super().__init__()
-        self.courses = courses
-        self.assignments = assignments
-        self.files = files
+        self.data = data
+        self.tips_cache = tips_cache
+        self.concurrency = concurrency
+        self.context_tokens = context_tokens
+        self.budget = RequestBudget(requests_per_minute)
+        # Running workers, including cancelled ones that haven't returned yet
         self.workers = []
+        self.active_worker = None
+        self.active_button = None
+        self.batch_worker = None
+        self.batch_pending = 0
+        # Per-course result boxes filled by "Analyze All"
+        self.course_panels = {}
 
         self.layout = QVBoxLayout(self)
         self.layout.setContentsMargins(20, 20, 20, 20)
@@ -43,6 +118,22 @@ class AnalysisPage(QWidget):
         sub_header.setStyleSheet("color: #bdc3c7; margin-bottom: 10px;")
         self.layout.addWidget(sub_header)
 
+        self.batch_button = QPushButton("Analyze All Courses 🪄")
+        self.batch_button.setCursor(Qt.PointingHandCursor)
+        self.batch_button.setStyleSheet("""
+            QPushButton {
+                background-color: #2980b9;
+                color: white;
+                border-radius: 6px;
+                padding: 8px;
+                font-weight: bold;
+            }
+            QPushButton:hover { background-color: #3498db; }
+        """)
+        self.batch_button.setEnabled(bool(self.data))
+        self.batch_button.clicked.connect(self.toggle_batch_analysis)
+        self.layout.addWidget(self.batch_button)
+
         scroll = QScrollArea()
         scroll.setWidgetResizable(True)
         scroll.setFrameShape(QScrollArea.NoFrame)
@@ -80,12 +171,12 @@ class AnalysisPage(QWidget):
         self.layout.addWidget(self.result_area)
 
     def populate_courses(self):
-        if not self.courses:
+        if not self.data:
             self.courses_layout.addWidget(QLabel("No courses available."))
             return
 
-        for course in self.courses:
-            c_name = course.get("course_name", "Unknown Course")
+        for course in self.data:
+            c_name = course.name
 
             row_widget = QWidget()
             row_layout = QVBoxLayout(row_widget)
@@ -112,10 +203,26 @@ class AnalysisPage(QWidget):
                 QPushButton:disabled { background-color: #7f8c8d; }
             """)
 
-            btn.clicked.connect(lambda checked, n=c_name, b=btn: self.start_analysis(n, b))
+            btn.clicked.connect(lambda checked, c=course.id, b=btn: self.start_analysis(c, b))
 
             row_layout.addWidget(btn)
 
+            panel = QTextEdit()
+            panel.setReadOnly(True)
+            panel.setVisible(False)
+            panel.setMinimumHeight(150)
+            panel.setStyleSheet("""
+                QTextEdit {
+                    background-color: #2c3e50;
+                    color: white;
+                    border-radius: 8px;
+                    padding: 8px;
+                    font-size: 13px;
+                }
+            """)
+            row_layout.addWidget(panel)
+            self.course_panels[course.id] = panel
+
             line = QFrame()
             line.setFrameShape(QFrame.HLine)
             line.setFrameShadow(QFrame.Sunken)
@@ -124,7 +231,9 @@ class AnalysisPage(QWidget):
 
             self.courses_layout.addWidget(row_widget)
 
-    def start_analysis(self, course_name, button):
+    def start_analysis(self, course_id, button):
+        self.cancel_analysis()
+        course_name = self.data.course(course_id).name
         button.setEnabled(False)
         button.setText("Thinking...")
         self.result_label.setVisible(True)
@@ -132,28 +241,97 @@ class AnalysisPage(QWidget):
         self.result_area.setVisible(True)
         self.result_area.clear()
 
-        c_assigns = next((a["assignments"] for a in self.assignments if a.get("course_name") == course_name), [])
+        worker = AnalysisWorker(course_name, self.data.assignments_for(course_id),
+                                self.data.modules_for(course_id), cache=self.tips_cache,
+                                budget=self.budget, token_budget=self.context_tokens)
+        worker.chunk.connect(self.handle_chunk)
+        worker.tips_ready.connect(lambda tips: self.handle_success(tips, button))
+        worker.error.connect(lambda err: self.handle_error(err, button))
+        worker.finished.connect(lambda w=worker: self.workers.remove(w))
 
-        c_modules = []
-        for f_dict in self.files:
-            if course_name in f_dict:
-                c_modules = f_dict[course_name]
-                break
+        self.workers.append(worker)
+        self.active_worker = worker
+        self.active_button = button
+        worker.start()
 
-        worker = AnalysisWorker(course_name, c_assigns, c_modules)
-        worker.finished.connect(lambda tips: self.handle_success(tips, button))
-        worker.error.connect(lambda err: self.handle_error(err, button))
+    def toggle_batch_analysis(self):
+        if self.batch_worker is not None:
+            self.cancel_batch_analysis()
+            return
+
+        jobs = [(course.id, course.name, self.data.assignments_for(course.id),
+                 self.data.modules_for(course.id)) for course in self.data]
+        worker = BatchAnalysisWorker(jobs, cache=self.tips_cache, budget=self.budget,
+                                     concurrency=self.concurrency,
+                                     token_budget=self.context_tokens)
+        worker.course_done.connect(self.handle_batch_result)
+        worker.course_failed.connect(
+            lambda course_id, err: self.handle_batch_result(course_id, f"Error: {err}"))
+        worker.finished.connect(lambda w=worker: self.handle_batch_finished(w))
+        worker.finished.connect(lambda w=worker: self.workers.remove(w))
 
         self.workers.append(worker)
+        self.batch_worker = worker
+        self.batch_pending = len(jobs)
+        self.batch_button.setText(f"Stop ({self.batch_pending} left)")
         worker.start()
 
+    def cancel_batch_analysis(self):
+        worker = self.batch_worker
+        if worker is None:
+            return
+        worker.requestInterruption()
+        worker.course_done.disconnect()
+        worker.course_failed.disconnect()
+        self.handle_batch_finished(worker)
+
+    def handle_batch_result(self, course_id, tips):
+        panel = self.course_panels.get(course_id)
+        if panel is not None:
+            panel.setMarkdown(tips)
+            panel.setVisible(True)
+        self.batch_pending -= 1
+        self.batch_button.setText(f"Stop ({self.batch_pending} left)")
+
+    def handle_batch_finished(self, worker):
+        if worker is not self.batch_worker:
+            return
+        self.batch_worker = None
+        self.batch_button.setText("Analyze All Courses 🪄")
+
+    def cancel_analysis(self):
+        """Stop streaming the current course's tips, e.g. when another course is picked"""
+        worker = self.active_worker
+        if worker is None:
+            return
+        worker.requestInterruption()
+        for signal in (worker.chunk, worker.tips_ready, worker.error):
+            signal.disconnect()
+        self.active_button.setEnabled(True)
+        self.active_button.setText("Generate Tips 🪄")
+        self.active_worker = None
+        self.active_button = None
+
+    def handle_chunk(self, text):
+        # Plain text while streaming; the finished answer is re-rendered as Markdown
+        if self.result_label.text() != "Analysis Results:":
+            self.result_label.setText("Analysis Results:")
+        cursor = self.result_area.textCursor()
+        cursor.movePosition(QTextCursor.End)
+        cursor.insertText(text)
+        self.result_area.setTextCursor(cursor)
+
     def handle_success(self, tips, button):
+        self.active_worker = None
+        self.active_button = None
         self.result_area.setMarkdown(tips)
         self.result_label.setText("Analysis Results:")
         button.setEnabled(True)
         button.setText("Generate Tips 🪄")
 
     def handle_error(self, error_msg, button):
+        self.active_worker = None
+        self.active_button = None
         self.result_area.setText(f"Error: {error_msg}")
         button.setEnabled(True)
         button.setText("Retry")
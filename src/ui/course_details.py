@@ -4,6 +4,8 @@ from PySide6.QtWidgets import (
 from PySide6.QtCore import Signal, Qt, QUrl
 from PySide6.QtGui import QDesktopServices, QFont
 
+from src.utils.data_transformer import format_time
+
 class CourseDetailPage(QWidget):
     """Displays details for a single course"""
 
@@ -61,8 +63,8 @@ class CourseDetailPage(QWidget):
         else:
             for hw in assignments:
                 row = QHBoxLayout()
-                hw_name = hw.get('assignment_name', 'Unknown')
-                hw_due = hw.get('due_at', 'No Date')
+                hw_name = hw.name
+                hw_due = format_time(hw.due_ts) or 'No Date'
 
                 info_lbl = QLabel(f"{hw_name}\nDue: {hw_due}")
                 info_lbl.setStyleSheet("font-size: 11px; color: white;")
@@ -72,7 +74,7 @@ class CourseDetailPage(QWidget):
                 link_btn.setFixedSize(24, 24)
                 link_btn.setCursor(Qt.PointingHandCursor)
                 link_btn.setStyleSheet("background-color: #2980b9; border-radius: 4px;")
-                link_btn.clicked.connect(lambda _, url=hw.get("url"): self.open_link(url))
+                link_btn.clicked.connect(lambda _, url=hw.url: self.open_link(url))
                 row.addWidget(link_btn)
 
                 content_layout.addLayout(row)
@@ -87,14 +89,14 @@ class CourseDetailPage(QWidget):
             content_layout.addWidget(QLabel("No files found."))
         else:
             for module in files:
-                mod_name = module.get("module_name", "Module")
+                mod_name = module.name
                 mod_lbl = QLabel(f"📂 {mod_name}")
                 mod_lbl.setStyleSheet("font-weight: bold; color: #95a5a6; margin-top: 5px;")
                 content_layout.addWidget(mod_lbl)
 
-                for f in module.get("files", []):
+                for f in module.items:
                     row = QHBoxLayout()
-                    f_name = f.get("name", "File")
+                    f_name = f.name
                     f_lbl = QLabel(f"📄 {f_name}")
                     f_lbl.setStyleSheet("font-size: 11px; color: white; margin-left: 10px;")
                     row.addWidget(f_lbl)
@@ -103,7 +105,7 @@ class CourseDetailPage(QWidget):
                     link_btn.setFixedSize(24, 24)
                     link_btn.setCursor(Qt.PointingHandCursor)
                     link_btn.setStyleSheet("background-color: #27ae60; border-radius: 4px;")
-                    link_btn.clicked.connect(lambda _, url=f.get("url"): self.open_link(url))
+                    link_btn.clicked.connect(lambda _, url=f.url: self.open_link(url))
                     row.addWidget(link_btn)
 
                     content_layout.addLayout(row)
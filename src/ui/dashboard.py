@@ -7,12 +7,12 @@ from PySide6.QtCore import Signal, Qt
 
 class DashboardPage(QWidget):
     """Dashboard page widget"""
-    course_selected = Signal(dict)
+    course_selected = Signal(object)  # course id
     setup_canvas_api = Signal()
 
-    def __init__(self, courses, canvas_api=None):
+    def __init__(self, data, canvas_api=None, loading=False):
         super().__init__()
-        self.courses = courses
+        self.data = data
         self.canvas_api = canvas_api
 
         layout = QVBoxLayout(self)
@@ -24,8 +24,18 @@ class DashboardPage(QWidget):
 
         layout.addSpacing(10)
 
-        # If no API token set, show setup button
-        if not canvas_api:
+        # Credentials are set but the first course list hasn't arrived yet
+        if loading and not data:
+            layout.addStretch()
+            placeholder = QLabel("Loading your courses from Canvas...")
+            placeholder.setAlignment(Qt.AlignCenter)
+            layout.addWidget(placeholder)
+            layout.addStretch()
+            self.setLayout(layout)
+            return
+
+        # If no API token set (and nothing cached to show), show setup button
+        if not canvas_api and not data:
             layout.addStretch()
             setup_btn = QPushButton("Configure Canvas API Key")
             setup_btn.setMinimumHeight(60)
@@ -67,33 +77,18 @@ class DashboardPage(QWidget):
         self.setLayout(layout)
 
     def populate_courses(self):
-        # Get courses from canvas_api if available
-        course_names = []
-        if self.canvas_api and hasattr(self.canvas_api, 'courses'):
-            # Use courses from Canvas API
-            for course in self.canvas_api.courses:
-                course_names.append(course.get("name", "Unknown"))
-        else:
-            # Fallback to passed courses
-            for course in self.courses:
-                if isinstance(course, dict):
-                    name = course.get("course_name", "Unknown Course")
-                else:
-                    name = str(course)
-                course_names.append(name)
-
         # Calculate adaptive button height based on number and length of courses
-        num_courses = len(course_names)
+        num_courses = len(self.data)
         if num_courses == 0:
             return
 
         # Calculate base height: longer names = taller buttons
-        max_name_length = max(len(name) for name in course_names)
+        max_name_length = max(len(course.name) for course in self.data)
         base_height = max(50, min(25 + max_name_length, 100))
 
         # Add buttons for each course
-        for course_name in course_names:
-            btn = QPushButton(course_name)
+        for course in self.data:
+            btn = QPushButton(course.name)
             btn.setCursor(Qt.PointingHandCursor)
             btn.setMinimumHeight(base_height)
             btn.setStyleSheet("""
@@ -111,8 +106,7 @@ class DashboardPage(QWidget):
                 }
             """)
 
-            # For now, emit a dummy course_selected signal
-            btn.clicked.connect(lambda checked, name=course_name: self.course_selected.emit(
-                {"course_name": name}))
+            btn.clicked.connect(lambda checked, course_id=course.id: self.course_selected.emit(
+                course_id))
 
             self.course_layout.addWidget(btn)
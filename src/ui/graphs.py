@@ -12,18 +12,106 @@ except ImportError:
     from matplotlib.backends.backend_qtagg import FigureCanvasQTAgg
     from matplotlib.figure import Figure
 
+import plotly
 import plotly.graph_objects as go
+import json
 import tempfile
 import os
+from functools import lru_cache
+from pathlib import Path
+
+from src.utils.analytics import running_grades
+from src.utils.records import CourseRepository
+
+PLOTLYJS_VERSION = plotly.offline.get_plotlyjs_version()
+# Fallback location when plotly.js can't be read straight from the installed package
+PLOTLYJS_CACHE_DIR = Path.home() / ".cache" / "skollr"
+
+# Chart document: plotly.js is loaded once and each chart lives in its own div.
+# Charts are drawn, and later updated in place, through renderChart()/showEmpty().
+CHARTS_HTML = """<html>
+<head>
+<meta charset="utf-8">
+<script src="{plotlyjs}"></script>
+<style>
+  body {{ margin: 0; background: white; font-family: Arial; }}
+  .chart {{ margin-bottom: 20px; }}
+  .empty {{ display: flex; align-items: center; justify-content: center; height: 200px; color: #7f8c8d; }}
+</style>
+</head>
+<body>
+{divs}
+<script>
+function renderChart(id, fig) {{
+  var el = document.getElementById(id);
+  if (el.classList.contains("empty")) {{
+    el.classList.remove("empty");
+    el.textContent = "";
+  }}
+  Plotly.react(el, fig.data, fig.layout, {{responsive: true}});
+}}
+function showEmpty(id, message) {{
+  var el = document.getElementById(id);
+  Plotly.purge(el);
+  el.className = "chart empty";
+  el.textContent = message;
+}}
+{calls}
+</script>
+</body>
+</html>"""
+
+# Constant uirevision: Plotly.react keeps the user's zoom and selection across updates
+UI_REVISION = "skollr-charts"
+
+
+@lru_cache(maxsize=1)
+def local_plotlyjs():
+    """Return (base URL, file name) of a local plotly.js bundle.
+
+    Chart HTML is loaded with this base URL and references the bundle by name,
+    so charts work offline and the HTML only carries the figure JSON.
+    """
+    bundled = Path(plotly.__file__).parent / "package_data" / "plotly.min.js"
+    if bundled.is_file():
+        path = bundled
+    else:
+        # e.g. zipped or frozen installs: write the bundle out once per version
+        path = PLOTLYJS_CACHE_DIR / f"plotly-{PLOTLYJS_VERSION}.min.js"
+        if not path.is_file():
+            path.parent.mkdir(parents=True, exist_ok=True)
+            path.write_text(plotly.offline.get_plotlyjs(), encoding="utf-8")
+    return QUrl.fromLocalFile(str(path.parent) + os.sep), path.name
+
+
+def figure_json(fig):
+    """Serialize a figure for inline <script> use"""
+    return fig.to_json().replace("</", "<\\/")
 
 
 class GraphsPage(QWidget):
-    """Graphs page widget"""
+    """Graphs page widget
 
-    def __init__(self, courses=None, assignments=None):
+    By default every chart is drawn into one shared QWebEngineView (one renderer,
+    one copy of plotly.js); pass single_view=False for one view per chart.
+    New data is pushed into the loaded charts with update_data().
+    """
+
+    # (div id, figure builder, message shown when there's nothing to plot, min height)
+    CHARTS = (
+        ("grade-bar", "_build_grade_bar_figure", "No grade data available", 400),
+        ("grade-pie", "_build_grade_pie_figure", "No letter grades available", 400),
+        ("grade-time", "_build_grade_vs_time_figure", "No assignment data available", 480),
+    )
+
+    def __init__(self, data=None, single_view=True):
         super().__init__()
-        self.courses = courses or []
-        self.assignments = assignments or []
+        self.data = data if data is not None else CourseRepository()
+        self.single_view = single_view
+        # div id -> hosting web view / last figure JSON sent to it (None = empty)
+        self.chart_views = {}
+        self.chart_json = {}
+        self.loaded_views = set()
 
         main_layout = QVBoxLayout()
         main_layout.setContentsMargins(20, 20, 20, 20)
@@ -33,6 +121,12 @@ class GraphsPage(QWidget):
         label.setFont(QFont("Arial", 18, QFont.Bold))
         main_layout.addWidget(label)
 
+        if single_view and WEBENGINE_AVAILABLE and self.data:
+            # The shared page scrolls itself, so no QScrollArea is needed
+            main_layout.addWidget(self._create_charts_view(self._chart_figures()))
+            self.setLayout(main_layout)
+            return
+
         # Scrollable area for multiple graphs
         scroll = QScrollArea()
         scroll.setWidgetResizable(True)
@@ -43,14 +137,13 @@ class GraphsPage(QWidget):
         layout.setSpacing(20)
 
         # Add graphs if we have course data
-        if self.courses:
-            # Example 1: Bar chart of grades
-            layout.addWidget(self._create_grade_bar_chart())
-
-            # Example 2: Pie chart of grade distribution
-            layout.addWidget(self._create_grade_pie_chart())
-
-            layout.addWidget(self._create_grade_vs_time_chart())
+        if self.data:
+            for chart, (_, _, _, min_height) in zip(self._chart_figures(), self.CHARTS):
+                if WEBENGINE_AVAILABLE:
+                    layout.addWidget(self._create_charts_view([chart], min_height))
+                else:
+                    layout.addWidget(self._create_fallback_label(
+                        "Install PySide6-WebEngine for interactive graphs"))
         else:
             no_data = QLabel(
                 "No course data available.\nConfigure Canvas API in Settings to see graphs.")
@@ -63,22 +156,99 @@ class GraphsPage(QWidget):
         main_layout.addWidget(scroll)
         self.setLayout(main_layout)
 
-    def _create_grade_bar_chart(self):
-        """Create an interactive bar chart showing course grades"""
-        # Filter courses with grades
-        courses_with_grades = [
-            c for c in self.courses if c.get('current_percentage')]
+    def _chart_figures(self):
+        """Return [(div id, figure JSON or None, empty message)] for every chart"""
+        charts = []
+        for div_id, builder, message, _ in self.CHARTS:
+            fig = getattr(self, builder)()
+            if fig is not None:
+                fig.update_layout(uirevision=UI_REVISION)
+            charts.append((div_id, figure_json(fig) if fig is not None else None, message))
+        return charts
+
+    def _chart_document(self, charts):
+        divs = []
+        calls = []
+        for div_id, fig_json, message in charts:
+            if fig_json is None:
+                divs.append(f'<div id="{div_id}" class="chart empty">{message}</div>')
+            else:
+                divs.append(f'<div id="{div_id}" class="chart"></div>')
+                calls.append(f'renderChart("{div_id}", {fig_json});')
+        _, plotlyjs = local_plotlyjs()
+        return CHARTS_HTML.format(
+            plotlyjs=plotlyjs, divs="\n".join(divs), calls="\n".join(calls))
+
+    def _create_charts_view(self, charts, min_height=None):
+        """Render the given charts into one web view and document"""
+        web_view = QWebEngineView()
+        if min_height:
+            web_view.setMinimumHeight(min_height)
+        web_view.loadFinished.connect(
+            lambda ok, v=web_view: self.loaded_views.add(v) if ok else None)
+        for div_id, fig_json, _ in charts:
+            self.chart_views[div_id] = web_view
+            self.chart_json[div_id] = fig_json
+        base_url, _ = local_plotlyjs()
+        web_view.setHtml(self._chart_document(charts), base_url)
+        return web_view
 
-        if not WEBENGINE_AVAILABLE:
-            return self._create_fallback_label("Install PySide6-WebEngine for interactive graphs")
+    def update_data(self, data):
+        """Push new data into the charts without reloading their pages.
 
-        web_view = QWebEngineView()
-        web_view.setMinimumHeight(400)
+        Only charts whose figure changed are redrawn (Plotly.react), so there's no
+        flicker and zoom/selection survive. Returns False when the page has to be
+        rebuilt instead (e.g. it was showing the no-data placeholder).
+        """
+        self.data = data
+        if not self.chart_views or not self.data:
+            return False
+
+        charts = self._chart_figures()
+        stale_views = set()
+        for div_id, fig_json, message in charts:
+            if fig_json == self.chart_json.get(div_id):
+                continue
+            view = self.chart_views[div_id]
+            if view not in self.loaded_views:
+                # renderChart isn't defined until the page loads; reload it instead
+                stale_views.add(view)
+                continue
+            self._send_chart(view, div_id, fig_json, message)
+
+        for view in stale_views:
+            view_charts = [c for c in charts if self.chart_views[c[0]] is view]
+            for div_id, fig_json, _ in view_charts:
+                self.chart_json[div_id] = fig_json
+            base_url, _ = local_plotlyjs()
+            view.setHtml(self._chart_document(view_charts), base_url)
+        return True
+
+    def _send_chart(self, view, div_id, fig_json, message):
+        self.chart_json[div_id] = fig_json
+        if fig_json is None:
+            script = f'showEmpty("{div_id}", {json.dumps(message)});'
+        else:
+            script = f'renderChart("{div_id}", {fig_json});'
+        view.page().runJavaScript(script)
+
+    def _create_fallback_label(self, message):
+        """Create a fallback label when WebEngine is not available"""
+        label = QLabel(message)
+        label.setAlignment(Qt.AlignmentFlag.AlignCenter)
+        label.setStyleSheet("color: #7f8c8d; font-size: 14px;")
+        return label
+
+    def _build_grade_bar_figure(self):
+        """Bar chart of course grades, or None without grade data"""
+        # Filter courses with grades
+        courses_with_grades = [
+            c for c in self.data if c.current_percentage]
 
         if courses_with_grades:
             # Prepare data
-            names = [c['course_name'] for c in courses_with_grades]
-            scores = [c['current_percentage'] for c in courses_with_grades]
+            names = [c.name for c in courses_with_grades]
+            scores = [c.current_percentage for c in courses_with_grades]
 
             # Create interactive bar chart
             fig = go.Figure(data=[
@@ -108,36 +278,18 @@ class GraphsPage(QWidget):
                 margin=dict(l=20, r=20, t=50, b=50),
                 height=max(300, len(courses_with_grades) * 40)
             )
+            return fig
+        return None
 
-            html = fig.to_html(include_plotlyjs='cdn')
-        else:
-            html = '<html><body style="display:flex;align-items:center;justify-content:center;height:100%;font-family:Arial;color:#7f8c8d;">No grade data available</body></html>'
-
-        web_view.setHtml(html)
-        return web_view
-
-    def _create_fallback_label(self, message):
-        """Create a fallback label when WebEngine is not available"""
-        label = QLabel(message)
-        label.setAlignment(Qt.AlignmentFlag.AlignCenter)
-        label.setStyleSheet("color: #7f8c8d; font-size: 14px;")
-        return label
-
-    def _create_grade_pie_chart(self):
-        """Create an interactive pie chart showing grade distribution"""
+    def _build_grade_pie_figure(self):
+        """Donut chart of letter grades, or None without letter grades"""
         # Count letter grades
         grade_counts = {}
-        for course in self.courses:
-            grade = course.get('current_grade')
+        for course in self.data:
+            grade = course.current_grade
             if grade:
                 grade_counts[grade] = grade_counts.get(grade, 0) + 1
 
-        if not WEBENGINE_AVAILABLE:
-            return self._create_fallback_label("Install PySide6-WebEngine for interactive graphs")
-
-        web_view = QWebEngineView()
-        web_view.setMinimumHeight(400)
-
         if grade_counts:
             labels = list(grade_counts.keys())
             sizes = list(grade_counts.values())
@@ -168,44 +320,19 @@ class GraphsPage(QWidget):
                 legend=dict(orientation='h', yanchor='bottom',
                             y=-0.1, xanchor='center', x=0.5)
             )
+            return fig
+        return None
 
-            html = fig.to_html(include_plotlyjs='cdn')
-        else:
-            html = '<html><body style="display:flex;align-items:center;justify-content:center;height:100%;font-family:Arial;color:#7f8c8d;">No letter grades available</body></html>'
-
-        web_view.setHtml(html)
-        return web_view
-    
-    def _create_grade_vs_time_chart(self):
-        """Plot running grade % vs time for each course, from earliest assignment date → now.
-        - Assumes self.assignments is a list of { "course_name": str, "assignments": [ ... ] }
-        - Each assignment: { "assignment_name": str, "due_at": str, "total_points": float, "score": float or None }
-        - Missing 'score' is treated as 0 (changeable; comments below show how to ignore ungraded).
+    def _build_grade_vs_time_figure(self):
+        """Plot running grade % vs time for each course, from earliest assignment date → today.
+        - Reads each course's Assignment records (due_ts in epoch seconds, total_points) from self.data
+        - Assignments carry no score yet, so each counts as 0 earned (comments below show how to ignore ungraded).
         """
-        if not WEBENGINE_AVAILABLE:
-            return self._create_fallback_label("WebEngine not available for interactive charts")
-
-        from datetime import datetime
+        from datetime import datetime, date, timedelta
 
-        web_view = QWebEngineView()
-        web_view.setMinimumHeight(480)
-
-        # -------------------------
-        # Helper: parse Canvas-style date
-        # Example: "Dec 09, 2025 11:59 PM Central Standard Time"
-        # Keep first 5 tokens -> "Dec 09, 2025 11:59 PM"
-        # -------------------------
-        def parse_canvas_date(raw):
-            if not raw:
-                return None
-            parts = raw.split()
-            if len(parts) < 5:
-                return None
-            trimmed = " ".join(parts[:5])
-            try:
-                return datetime.strptime(trimmed, "%b %d, %Y %I:%M %p")
-            except Exception:
-                return None
+        # The timeline ends at midnight tonight rather than datetime.now(), so the
+        # figure only changes when the data does and update_data can skip it
+        end_of_today = datetime.combine(date.today() + timedelta(days=1), datetime.min.time())
 
         # -------------------------
         # Collect and normalize input
@@ -214,32 +341,26 @@ class GraphsPage(QWidget):
         course_points = {}
         earliest = None
 
-        for course in self.assignments:
-            cname = course.get("course_name", "Unknown Course")
+        for course in self.data:
+            cname = course.name
             entries = []
 
-            for a in course.get("assignments", []):
-                raw_due = a.get("due_at")
-                dt = parse_canvas_date(raw_due)
-                if dt is None:
+            for a in self.data.assignments_for(course.id):
+                if a.due_ts is None:
                     continue
+                dt = datetime.fromtimestamp(a.due_ts)
 
-                total = a.get("total_points")
                 # skip if no total_points
-                if total is None:
+                if a.total_points is None:
                     continue
 
-                # if the assignment has an explicit score use it, otherwise treat as 0
-                # (If you prefer to ignore ungraded items, set `earned = None` and handle below)
-                earned = a.get("score", 0.0)
+                # no score on the record yet, so treat it as 0
+                # (If you prefer to ignore ungraded items, `continue` here instead)
+                earned = 0.0
                 try:
-                    total = float(total)
+                    total = float(a.total_points)
                 except Exception:
                     continue
-                try:
-                    earned = float(earned) if earned is not None else 0.0
-                except Exception:
-                    earned = 0.0
 
                 entries.append((dt, earned, total))
 
@@ -247,78 +368,21 @@ class GraphsPage(QWidget):
                     earliest = dt
 
             if entries:
-                # sort per-course
-                entries.sort(key=lambda x: x[0])
                 course_points[cname] = entries
 
         # If there's no parsed date at all, fallback single point
         if earliest is None:
-            from datetime import datetime
             fig = go.Figure()
-            fig.add_trace(go.Scatter(x=[datetime.now()], y=[0], mode="markers", name="No data"))
+            fig.add_trace(go.Scatter(x=[end_of_today], y=[0], mode="markers", name="No data"))
             fig.update_layout(title="Running Grade vs Time (Per Course)", xaxis_title="Date", yaxis_title="Grade (%)")
-            html = fig.to_html(include_plotlyjs="cdn")
-            web_view.setHtml(html)
-            return web_view
-
-        # Global timeline: all unique assignment dates across all courses, plus "now" (end)
-        now = datetime.now()
-        all_dates = set()
-        for entries in course_points.values():
-            for dt, _, _ in entries:
-                all_dates.add(dt)
-        all_dates.add(now)
-        timeline = sorted(all_dates)
-
-        # -------------------------
-        # For each course, compute grade at each timestamp in `timeline`.
-        # grade(t) uses assignments with due <= t.
-        # -------------------------
-        traces = []
-        for cname, entries in course_points.items():
-            # entries already sorted by date
-            idx = 0
-            cumulative_earned = 0.0
-            cumulative_total = 0.0
-            x_vals = []
-            y_vals = []
-
-            # Walk timeline in order; advance through entries as timeline progresses
-            for t in timeline:
-                # include all entries whose due <= t
-                while idx < len(entries) and entries[idx][0] <= t:
-                    dt_e, earned_e, total_e = entries[idx]
-                    # treat earned_e as 0 if None (we already set it to 0 above)
-                    if earned_e is None:
-                        # if you prefer to IGNORE ungraded items, comment the next line out
-                        earned_add = 0.0
-                    else:
-                        earned_add = earned_e
-                    cumulative_earned += earned_add
-                    cumulative_total += total_e
-                    idx += 1
-
-                # compute grade only if there's any available points up to t
-                if cumulative_total > 0:
-                    grade_pct = (cumulative_earned / cumulative_total) * 100.0
-                    # clamp to [0,100] just in case
-                    grade_pct = max(0.0, min(100.0, grade_pct))
-                    x_vals.append(t)
-                    y_vals.append(grade_pct)
-                else:
-                    # no available points yet -> append None so Plotly leaves a gap
-                    x_vals.append(t)
-                    y_vals.append(None)
+            return fig
 
-            # If course never had any available points, skip it
-            if all(v is None for v in y_vals):
-                continue
-
-            traces.append({
-                "name": cname,
-                "x": x_vals,
-                "y": y_vals
-            })
+        # Running grade of every course on the shared timeline of due dates, plus the end of today
+        timeline, names, grades = running_grades(course_points, end=end_of_today)
+        traces = [
+            {"name": cname, "x": timeline, "y": grades[i]}
+            for i, cname in enumerate(names)
+        ]
 
         # -------------------------
         # Build Plotly figure with one trace per course
@@ -366,10 +430,6 @@ class GraphsPage(QWidget):
             yaxis=dict(range=[0, 100])
         )
 
-        # Improve x-axis range: from earliest -> now
-        fig.update_xaxes(range=[earliest, now])
-
-        # Render and return
-        html = fig.to_html(include_plotlyjs="cdn")
-        web_view.setHtml(html)
-        return web_view
+        # Improve x-axis range: from earliest -> end of today
+        fig.update_xaxes(range=[earliest, end_of_today])
+        return fig
@@ -0,0 +1,94 @@
+"""Background auto-refresh for SKOLLR"""
+
+from PySide6.QtCore import QObject, QThread, QTimer, Signal
+
+from src.utils.log import get_logger
+
+log = get_logger(__name__)
+
+# Seconds between refreshes of each kind of data
+DEFAULT_REFRESH_INTERVALS = {
+    "grades": 5 * 60,
+    "assignments": 10 * 60,
+    "files": 2 * 60 * 60,
+}
+
+
+class RefreshWorker(QThread):
+    """Runs one refresh job off the GUI thread"""
+    result = Signal(str, object)
+    error = Signal(str, str)
+
+    def __init__(self, kind, job):
+        super().__init__()
+        self.kind = kind
+        self.job = job
+
+    def run(self):
+        try:
+            self.result.emit(self.kind, self.job())
+        except Exception as e:
+            log.exception("Error refreshing %s: %s", self.kind, e)
+            self.error.emit(self.kind, str(e))
+
+
+class RefreshScheduler(QObject):
+    """Re-fetches each kind of Canvas data on its own interval from the Qt event loop.
+
+    `jobs` maps a kind to a factory called on the GUI thread; it returns the
+    callable that does the actual fetch in a RefreshWorker. A refresh that comes
+    due while the previous one of the same kind is still running is coalesced into it.
+    """
+    refreshed = Signal(str, object)  # kind, result
+    failed = Signal(str, str)  # kind, error message
+
+    def __init__(self, jobs, intervals=None, parent=None):
+        super().__init__(parent)
+        self.jobs = jobs
+        self.intervals = {**DEFAULT_REFRESH_INTERVALS, **(intervals or {})}
+        self.timers = {}
+        self.active = {}
+
+        for kind in self.jobs:
+            timer = QTimer(self)
+            timer.setInterval(int(self.intervals[kind] * 1000))
+            timer.timeout.connect(lambda k=kind: self.trigger(k))
+            self.timers[kind] = timer
+
+    def start(self):
+        for timer in self.timers.values():
+            timer.start()
+
+    def stop(self):
+        for timer in self.timers.values():
+            timer.stop()
+
+    def trigger(self, kind):
+        """Refresh `kind` now, unless a refresh of it is already running"""
+        if kind in self.active:
+            return
+        worker = RefreshWorker(kind, self.jobs[kind]())
+        worker.result.connect(self.refreshed.emit)
+        worker.error.connect(self.failed.emit)
+        worker.finished.connect(lambda k=kind: self._reclaim(k))
+        self.active[kind] = worker
+        worker.start()
+
+    def _reclaim(self, kind):
+        worker = self.active.pop(kind, None)
+        if worker is not None:
+            worker.deleteLater()
+
+
+def intervals_from_env(environ):
+    """Interval overrides in seconds from SKOLLR_REFRESH_GRADES / _ASSIGNMENTS / _FILES"""
+    intervals = {}
+    for kind in DEFAULT_REFRESH_INTERVALS:
+        raw = environ.get(f"SKOLLR_REFRESH_{kind.upper()}", "").strip()
+        try:
+            seconds = float(raw)
+        except ValueError:
+            continue
+        if seconds > 0:
+            intervals[kind] = seconds
+    return intervals
@@ -1,6 +1,6 @@
 """Settings page for SKOLLR"""
 
-from PySide6.QtWidgets import QWidget, QVBoxLayout, QLabel, QPushButton, QHBoxLayout
+from PySide6.QtWidgets import QWidget, QVBoxLayout, QLabel, QPushButton, QHBoxLayout, QCheckBox
 from PySide6.QtGui import QFont
 from PySide6.QtCore import Signal, Qt
 
@@ -9,8 +9,10 @@ class SettingsPage(QWidget):
     """Settings page widget"""
 
     configure_canvas = Signal()  # Signal to open Canvas credentials dialog
+    configure_gemini = Signal()  # Signal to open the Gemini key / model dialog
+    debug_logging_toggled = Signal(bool)
 
-    def __init__(self):
+    def __init__(self, debug_logging=False):
         super().__init__()
         layout = QVBoxLayout()
         layout.setContentsMargins(20, 20, 20, 20)
@@ -45,5 +47,35 @@ class SettingsPage(QWidget):
         btn.clicked.connect(self.configure_canvas.emit)
         layout.addWidget(btn)
 
+        ai_subtitle = QLabel("AI study tips")
+        ai_subtitle.setFont(QFont("Arial", 12))
+        layout.addWidget(ai_subtitle)
+
+        gemini_btn = QPushButton("Edit Gemini API Key & Model")
+        gemini_btn.setMinimumHeight(46)
+        gemini_btn.setCursor(Qt.PointingHandCursor)
+        gemini_btn.setStyleSheet(
+            """
+            QPushButton {
+                background-color: #8e44ad;
+                color: white;
+                border-radius: 8px;
+                padding: 10px 14px;
+                font-weight: bold;
+            }
+            QPushButton:hover {
+                background-color: #9b59b6;
+            }
+            """
+        )
+        gemini_btn.clicked.connect(self.configure_gemini.emit)
+        layout.addWidget(gemini_btn)
+
+        # Verbose Canvas sync tracing in the terminal, switchable without a restart
+        debug_box = QCheckBox("Debug logging")
+        debug_box.setChecked(debug_logging)
+        debug_box.toggled.connect(self.debug_logging_toggled.emit)
+        layout.addWidget(debug_box)
+
         layout.addStretch()
         self.setLayout(layout)
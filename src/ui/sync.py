@@ -0,0 +1,209 @@
+"""Background Canvas sync for SKOLLR"""
+
+import asyncio
+import concurrent.futures
+from PySide6.QtCore import QThread, Signal
+
+from src.api.canvas_api import CanvasAPIError, CanvasLMSAPI, MAX_WORKERS
+from src.utils.records import CourseRepository
+from src.utils.snapshot_store import account_key
+from src.utils.log import get_logger
+
+log = get_logger(__name__)
+
+
+def failed_courses_message(course_ids):
+    count = len(set(course_ids))
+    return f"Canvas kept failing {count} course(s); their data may be out of date"
+
+
+class CanvasSyncWorker(QThread):
+    """Streams fresh Canvas data off the GUI thread and refreshes the local snapshot.
+
+    Course ids flow straight into the per-course fetches, and each course's
+    results are emitted as soon as they arrive; `loaded` fires once at the end.
+    Courses Canvas kept failing keep their previous records and are reported
+    through `error` after `loaded`.
+    """
+    courses_loaded = Signal(object, list)  # canvas_api, courses
+    course_assignments_loaded = Signal(object, list)  # course id, assignments
+    course_files_loaded = Signal(object, list)  # course id, modules
+    loaded = Signal(object, object)  # canvas_api, CourseRepository
+    error = Signal(str)
+
+    def __init__(self, api_token, base_url, snapshot=None, canvas_api=None,
+                 assignments=None, modules=None, cache=None):
+        super().__init__()
+        self.api_token = api_token
+        self.base_url = base_url
+        # Snapshots belong to one token on one Canvas instance
+        self.account = account_key(api_token, base_url)
+        self.snapshot = snapshot
+        self.canvas_api = canvas_api
+        self.cache = cache
+        # Data already on screen (course id -> records); when present only the deltas are fetched
+        self.assignments = assignments or {}
+        self.modules = modules or {}
+
+    def run(self):
+        try:
+            canvas_api = self.canvas_api or CanvasLMSAPI(
+                api_token=self.api_token, base_url=self.base_url, cache=self.cache)
+            if self.snapshot is not None and (self.assignments or self.modules):
+                canvas_api.validators.update(
+                    self.snapshot.load_validators(self.account))
+
+            courses = canvas_api.all_courses_and_grades()
+            self.courses_loaded.emit(canvas_api, courses)
+
+            data = CourseRepository(courses)
+            failed = []
+
+            # Both kinds share one pool, sized like the session's connection pool
+            with concurrent.futures.ThreadPoolExecutor(max_workers=MAX_WORKERS * 2) as executor:
+                futures = {}
+                for course in canvas_api.courses:
+                    course_id = course["id"]
+                    futures[executor.submit(
+                        canvas_api.fetch_course_assignments, course,
+                        self.assignments.get(course_id))] = ("assignments", course_id)
+                    futures[executor.submit(
+                        canvas_api.fetch_course_files, course,
+                        self.modules.get(course_id))] = ("files", course_id)
+
+                for future in concurrent.futures.as_completed(futures):
+                    if self.isInterruptionRequested():
+                        # Superseded by a newer sync; its results must not reach the snapshot
+                        executor.shutdown(wait=False, cancel_futures=True)
+                        return
+                    kind, course_id = futures[future]
+                    try:
+                        records, changed = future.result()
+                    except CanvasAPIError as e:
+                        log.error("Course %s: %s", course_id, e)
+                        failed.append(course_id)
+                        # Keep what's on screen; a course never loaded stays out rather than empty
+                        previous = self.assignments if kind == "assignments" else self.modules
+                        records, changed = previous.get(course_id), False
+                        if records is None:
+                            continue
+                    if kind == "assignments":
+                        data.assignments[course_id] = records
+                        if changed:
+                            self.course_assignments_loaded.emit(course_id, records)
+                    else:
+                        data.modules[course_id] = records
+                        if changed:
+                            self.course_files_loaded.emit(course_id, records)
+        except Exception as e:
+            log.exception("Error loading Canvas data: %s", e)
+            self.error.emit(str(e))
+            return
+
+        self.loaded.emit(canvas_api, data)
+        if failed:
+            self.error.emit(failed_courses_message(failed))
+
+        if self.snapshot is not None and not self.isInterruptionRequested():
+            try:
+                self.snapshot.save(self.account, data, canvas_api.validators)
+            except Exception as e:
+                log.exception("Could not save Canvas snapshot: %s", e)
+
+
+class AsyncCanvasSyncWorker(QThread):
+    """Streams Canvas data with the asyncio client on a private event loop.
+
+    Exposes the same signals as CanvasSyncWorker, so the window can use either backend.
+    """
+    courses_loaded = Signal(object, list)  # canvas_api, courses
+    course_assignments_loaded = Signal(object, list)  # course id, assignments
+    course_files_loaded = Signal(object, list)  # course id, modules
+    loaded = Signal(object, object)  # canvas_api, CourseRepository
+    error = Signal(str)
+
+    def __init__(self, api_token, base_url, snapshot=None, canvas_api=None,
+                 assignments=None, modules=None, cache=None):
+        super().__init__()
+        self.api_token = api_token
+        self.base_url = base_url
+        # Snapshots belong to one token on one Canvas instance
+        self.account = account_key(api_token, base_url)
+        self.snapshot = snapshot
+        # Data already on screen, kept for courses Canvas keeps failing
+        self.assignments = assignments or {}
+        self.modules = modules or {}
+        # The asyncio client opens its own session and has no cache or conditional requests
+        ignored = [name for name, value in (("canvas_api", canvas_api), ("cache", cache))
+                   if value is not None]
+        if ignored:
+            log.debug("asyncio backend ignores %s", ", ".join(ignored))
+        if self.assignments or self.modules:
+            log.debug("asyncio backend has no delta sync; fetching every course in full")
+
+    async def _load(self):
+        # Imported here so aiohttp only loads when the asyncio backend is chosen
+        from src.api.async_canvas_api import AsyncCanvasLMSAPI
+
+        async with AsyncCanvasLMSAPI(self.api_token, self.base_url) as canvas_api:
+            courses = await canvas_api.all_courses_and_grades()
+            self.courses_loaded.emit(canvas_api, courses)
+
+            data = CourseRepository(courses)
+            failed = []
+
+            async def tagged(kind, course, fetch):
+                try:
+                    return kind, course["id"], await fetch(course)
+                except CanvasAPIError as e:
+                    log.error("Course %s: %s", course["id"], e)
+                    return kind, course["id"], None
+
+            pending = []
+            for course in canvas_api.courses:
+                pending.append(asyncio.ensure_future(
+                    tagged("assignments", course, canvas_api.fetch_course_assignments)))
+                pending.append(asyncio.ensure_future(
+                    tagged("files", course, canvas_api.fetch_course_files)))
+
+            for next_done in asyncio.as_completed(pending):
+                kind, course_id, records = await next_done
+                if self.isInterruptionRequested():
+                    # Superseded by a newer sync: stop before the session closes under the tasks
+                    for task in pending:
+                        task.cancel()
+                    await asyncio.gather(*pending, return_exceptions=True)
+                    break
+                if records is None:
+                    failed.append(course_id)
+                    # Keep what's on screen; a course never loaded stays out rather than empty
+                    previous = self.assignments if kind == "assignments" else self.modules
+                    records = previous.get(course_id)
+                    if records is None:
+                        continue
+                if kind == "assignments":
+                    data.assignments[course_id] = records
+                    self.course_assignments_loaded.emit(course_id, records)
+                else:
+                    data.modules[course_id] = records
+                    self.course_files_loaded.emit(course_id, records)
+
+        return canvas_api, data, failed
+
+    def run(self):
+        try:
+            canvas_api, data, failed = asyncio.run(self._load())
+        except Exception as e:
+            log.exception("Error loading Canvas data: %s", e)
+            self.error.emit(str(e))
+            return
+
+        self.loaded.emit(canvas_api, data)
+        if failed:
+            self.error.emit(failed_courses_message(failed))
+
+        if self.snapshot is not None and not self.isInterruptionRequested():
+            try:
+                self.snapshot.save(self.account, data)
+            except Exception as e:
+                log.exception("Could not save Canvas snapshot: %s", e)
@@ -0,0 +1,47 @@
+"""Vectorized grade analytics for SKOLLR's charts"""
+
+import numpy as np
+
+
+def running_grades(course_points, end=None):
+    """Running grade % of every course on one shared timeline.
+
+    `course_points` maps a course name to a list of (due, earned, total) tuples,
+    where `due` is a datetime or numpy datetime64. The timeline holds every
+    distinct due date plus `end`; a course's grade at each point counts the
+    assignments due on or before it, clamped to [0, 100].
+
+    Returns (timeline, names, grades): a sorted datetime64 array, the names of
+    the courses that have any points, and a len(names) x len(timeline) float32
+    array that is NaN until a course has points. Plotly takes these directly.
+    """
+    names = [name for name, entries in course_points.items() if entries]
+    if not names:
+        return np.array([], dtype="datetime64[us]"), [], np.empty((0, 0), dtype=np.float32)
+
+    rows = [entry for name in names for entry in course_points[name]]
+    due = np.array([r[0] for r in rows], dtype="datetime64[us]")
+    earned = np.array([r[1] for r in rows], dtype=np.float64)
+    total = np.array([r[2] for r in rows], dtype=np.float64)
+    course = np.repeat(np.arange(len(names)), [len(course_points[n]) for n in names])
+
+    stamps = due if end is None else np.append(due, np.datetime64(end, "us"))
+    timeline = np.unique(stamps)
+    column = np.searchsorted(timeline, due)
+
+    # Scatter every assignment into its (course, date) cell, then accumulate along time
+    shape = (len(names), len(timeline))
+    earned_sum = np.zeros(shape)
+    total_sum = np.zeros(shape)
+    np.add.at(earned_sum, (course, column), earned)
+    np.add.at(total_sum, (course, column), total)
+    np.cumsum(earned_sum, axis=1, out=earned_sum)
+    np.cumsum(total_sum, axis=1, out=total_sum)
+
+    has_points = total_sum > 0
+    grades = np.full(shape, np.nan, dtype=np.float32)
+    np.divide(earned_sum, total_sum, out=earned_sum, where=has_points)
+    grades[has_points] = np.clip(100.0 * earned_sum[has_points], 0.0, 100.0)
+
+    keep = has_points.any(axis=1)
+    return timeline, [n for n, k in zip(names, keep) if k], grades[keep]
@@ -1,96 +1,107 @@
+import logging
 from datetime import datetime
 from dotenv import load_dotenv
 import os
+from src.utils.log import get_logger
+from src.utils.records import Course, Assignment, Module, ModuleItem
 load_dotenv()
+log = get_logger(__name__)
 CANVAS_BASE_URL = f'{os.getenv("CANVAS_BASE_URL")}'
 
 
-def format_time(time):
+def parse_time(time):
+    """Canvas ISO 8601 timestamp -> epoch seconds (UTC), or None"""
     if time:
-        dt_local = datetime.fromisoformat(
-            time.replace("Z", "+00:00")).astimezone()
+        return int(datetime.fromisoformat(time.replace("Z", "+00:00")).timestamp())
+    else:
+        return None
+
+
+def format_time(timestamp):
+    """Epoch seconds -> local display string such as "Dec 09, 2025 11:59 PM CST".
+
+    Records keep the epoch value; call this only when showing it.
+    """
+    if timestamp is not None:
+        dt_local = datetime.fromtimestamp(timestamp).astimezone()
         return dt_local.strftime("%b %d, %Y %I:%M %p %Z")
     else:
         return None
 
 
 def canva_courses_with_grade(courses):
-    print(
-        f"[DEBUG] canva_courses_with_grade: processing {len(courses) if courses else 0} courses")
     cleaned = []
-    for i, course in enumerate(courses):
-        print(f"  [DEBUG] Course {i}: {course.get('name', 'UNKNOWN')}")
+    # Checked once: per-course tracing is skipped entirely unless debug is on
+    trace = log.isEnabledFor(logging.DEBUG)
+    for course in courses:
         try:
             # Check if enrollments exist
             enrollments = course.get("enrollments", [])
-            print(f"    [DEBUG] Enrollments: {len(enrollments)} found")
             if not enrollments:
-                print(f"    [WARNING] No enrollments for {course.get('name')}")
+                # Still listed, just without a grade
+                log.warning("No enrollments for course %s", course.get("id"))
+                cleaned.append(Course(course["id"], course["name"]))
                 continue
 
             enrollment = enrollments[0]
-            print(f"    [DEBUG] Enrollment keys: {list(enrollment.keys())}")
-
             grade = enrollment.get("computed_current_grade")
             score = enrollment.get("computed_current_score")
-            print(f"    [DEBUG] Grade: {grade}, Score: {score}")
-
-            cleaned.append(
-                {
-                    "course_name": course["name"],
-                    "current_grade": grade,
-                    "current_percentage": score
-                }
-            )
+            if trace:
+                log.debug("Course %s: %d enrollment(s), grade %s, score %s",
+                          course.get("id"), len(enrollments), grade, score)
+
+            cleaned.append(Course(course["id"], course["name"], grade, score))
         except KeyError as e:
-            print(
-                f"    [ERROR] KeyError in course {course.get('name', 'UNKNOWN')}: {e}")
-            print(f"    [ERROR] Course data: {course}")
-        except Exception as e:
-            print(
-                f"    [ERROR] Unexpected error in course {course.get('name', 'UNKNOWN')}: {e}")
-
-    print(f"[DEBUG] Returning {len(cleaned)} cleaned courses")
+            log.error("Course %s is missing field %s", course.get("id"), e)
+        except Exception:
+            log.exception("Unexpected error in course %s", course.get("id"))
+
+    log.debug("Normalized %d of %d courses", len(cleaned), len(courses))
     return cleaned
 
 
-def canvas_course_assignments(assignments, course_name):
+def canvas_course_assignments(assignments):
     # print("Cleaning Data...")
-    cleaned = {"course_name": course_name}
-    all_assignments = []
-    for assignment in assignments:
-        all_assignments.append(
-            {
-                "assignment_name": assignment["name"],
-                "total_points": assignment["points_possible"],
-                "due_at": format_time(assignment["due_at"]),
-                "url": assignment["html_url"]
-            }
+    return [
+        Assignment(
+            id=assignment.get("id"),
+            name=assignment["name"],
+            total_points=assignment["points_possible"],
+            due_ts=parse_time(assignment["due_at"]),
+            url=assignment["html_url"],
+            updated_at=assignment.get("updated_at")
         )
-    cleaned["assignments"] = all_assignments
-    return cleaned
+        for assignment in assignments
+    ]
 
 
-def canvas_course_modules_and_files(modules: list[dict], course_name):
-    cleaned = {}
-    for module in modules:
-        mod_name = module["name"]
-        if course_name not in cleaned:
-            cleaned[course_name] = []
-        files = []
-
-        # Check if 'items' exists and is a list to be safe
-        for item in module.get("items", []):
-            files.append(
-                {
-                    "name": item["title"],
-                    "type": item["type"],
-                    "url": item.get("html_url", "#")
-                }
-            )
-        cleaned[course_name].append({
-            "module_name": mod_name,
-            "files": files
-        })
+def merge_updated_records(previous, fresh):
+    """Merges freshly fetched records into the previous ones by id and updated_at.
 
-    return cleaned
+    Records that haven't changed keep their previous object, so equality checks
+    against the old list stay cheap. Returns (merged, changed).
+    """
+    previous_by_id = {r.id: r for r in previous if r.id is not None}
+    merged = []
+    for record in fresh:
+        before = previous_by_id.get(record.id)
+        if before is not None and before.updated_at == record.updated_at:
+            merged.append(before)
+        else:
+            merged.append(record)
+    changed = len(merged) != len(previous) or any(
+        a is not b for a, b in zip(merged, previous))
+    return merged, changed
+
+
+def canvas_module(module):
+    # Check if 'items' exists and is a list to be safe
+    items = [
+        ModuleItem(name=item["title"], type=item["type"], url=item.get("html_url", "#"))
+        for item in module.get("items", [])
+    ]
+    return Module(module["name"], items)
+
+
+def canvas_course_modules_and_files(modules: list[dict]):
+    return [canvas_module(module) for module in modules]
@@ -0,0 +1,83 @@
+"""Logging for SKOLLR.
+
+Modules log through `get_logger(__name__)` with %-style arguments, so messages
+are only formatted when their level is enabled. `configure_logging()` installs
+the console handler (plus an optional JSON-lines file) once at startup, and
+`set_debug()` turns debug tracing on or off while the app runs.
+"""
+
+import json
+import logging
+import os
+from datetime import datetime, timezone
+
+ROOT_LOGGER = "skollr"
+CONSOLE_FORMAT = "[%(levelname)s] %(name)s: %(message)s"
+
+_root = logging.getLogger(ROOT_LOGGER)
+# Until configure_logging() runs, warnings and errors still reach stderr via logging.lastResort
+_root.setLevel(logging.INFO)
+
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per record, for machine-readable log files"""
+
+    def format(self, record):
+        entry = {
+            "time": datetime.fromtimestamp(record.created, timezone.utc).isoformat(),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        if record.exc_info:
+            entry["exception"] = self.formatException(record.exc_info)
+        return json.dumps(entry, ensure_ascii=False)
+
+
+def get_logger(name):
+    """Logger under the "skollr" namespace, e.g. get_logger(__name__) -> skollr.api.canvas_api"""
+    return logging.getLogger(f"{ROOT_LOGGER}.{name.removeprefix('src.')}")
+
+
+def configure_logging(level=None, json_path=None):
+    """Install the console handler and, if `json_path` is given, a JSON-lines sink.
+
+    Defaults come from SKOLLR_LOG_LEVEL (e.g. DEBUG, INFO) and SKOLLR_LOG_JSON;
+    an unknown level falls back to INFO with a warning.
+    Safe to call again; handlers are replaced, not stacked.
+    """
+    level = level or os.getenv("SKOLLR_LOG_LEVEL", "INFO")
+    json_path = json_path or os.getenv("SKOLLR_LOG_JSON")
+
+    for handler in list(_root.handlers):
+        _root.removeHandler(handler)
+        handler.close()
+
+    console = logging.StreamHandler()
+    console.setFormatter(logging.Formatter(CONSOLE_FORMAT))
+    _root.addHandler(console)
+
+    if json_path:
+        sink = logging.FileHandler(json_path, encoding="utf-8")
+        sink.setFormatter(JsonFormatter())
+        _root.addHandler(sink)
+
+    requested = level
+    if isinstance(level, str):
+        level = logging.getLevelNamesMapping().get(level.strip().upper())
+
+    _root.setLevel(level if level is not None else logging.INFO)
+    # Keep SKOLLR's records out of any handlers other libraries put on the root logger
+    _root.propagate = False
+    if level is None:
+        # A typo in .env shouldn't keep the app from starting
+        get_logger(__name__).warning("Unknown log level %r, using INFO", requested)
+
+
+def set_debug(enabled):
+    """Switch debug tracing on or off at runtime"""
+    _root.setLevel(logging.DEBUG if enabled else logging.INFO)
+
+
+def debug_enabled():
+    return _root.isEnabledFor(logging.DEBUG)
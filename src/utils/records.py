@@ -0,0 +1,75 @@
+"""Typed records for normalized Canvas data, and the per-course repository that holds them"""
+
+from dataclasses import dataclass, field
+
+
+@dataclass(slots=True)
+class Course:
+    id: int
+    name: str
+    current_grade: str | None = None
+    current_percentage: float | None = None
+
+
+@dataclass(slots=True)
+class Assignment:
+    id: int | None
+    name: str
+    total_points: float | None
+    due_ts: int | None  # epoch seconds
+    url: str | None
+    updated_at: str | None = None
+
+
+@dataclass(slots=True)
+class ModuleItem:
+    name: str
+    type: str
+    url: str
+
+
+@dataclass(slots=True)
+class Module:
+    name: str
+    items: list[ModuleItem] = field(default_factory=list)
+
+    @classmethod
+    def from_dict(cls, data):
+        return cls(data["name"], [ModuleItem(**item) for item in data["items"]])
+
+
+class CourseRepository:
+    """Courses plus each course's assignments and modules, keyed by course id.
+
+    Iterating yields the Course records in catalog order. Pages keep a reference
+    to one repository, so swap its contents instead of replacing the object.
+    """
+
+    def __init__(self, courses=(), assignments=None, modules=None):
+        self.courses = {course.id: course for course in courses}
+        self.assignments = dict(assignments or {})  # course id -> [Assignment]
+        self.modules = dict(modules or {})  # course id -> [Module]
+
+    def __iter__(self):
+        return iter(self.courses.values())
+
+    def __len__(self):
+        return len(self.courses)
+
+    def course(self, course_id):
+        return self.courses.get(course_id)
+
+    def assignments_for(self, course_id):
+        return self.assignments.get(course_id, [])
+
+    def modules_for(self, course_id):
+        return self.modules.get(course_id, [])
+
+    def set_courses(self, courses):
+        self.courses = {course.id: course for course in courses}
+
+    def replace(self, other):
+        """Take over another repository's contents, keeping this object's identity"""
+        self.courses = dict(other.courses)
+        self.assignments = dict(other.assignments)
+        self.modules = dict(other.modules)
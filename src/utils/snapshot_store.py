@@ -0,0 +1,129 @@
+"""Local SQLite snapshot of the normalized Canvas data, so startup can render instantly"""
+
+from dataclasses import asdict
+from datetime import datetime, timezone
+from sqlalchemy import (
+    create_engine, MetaData, Table, Column, String, Integer, JSON, select, delete
+)
+
+from src.utils.records import Course, Assignment, Module, CourseRepository
+from src.api.response_cache import token_identity
+
+# Bump whenever the shape of the normalized records changes; older snapshots are ignored
+SNAPSHOT_VERSION = 3
+
+metadata = MetaData()
+
+snapshot_meta = Table(
+    "snapshot_meta", metadata,
+    Column("key", String, primary_key=True),
+    Column("value", String, nullable=False),
+)
+
+# One row per course, and per course's assignment / module list, in catalog order
+snapshot_records = Table(
+    "snapshot_records", metadata,
+    Column("kind", String, primary_key=True),
+    Column("position", Integer, primary_key=True),
+    Column("payload", JSON, nullable=False),
+)
+
+# ETag / Last-Modified per Canvas endpoint, for conditional requests on the next sync
+sync_validators = Table(
+    "sync_validators", metadata,
+    Column("endpoint", String, primary_key=True),
+    Column("etag", String),
+    Column("last_modified", String),
+    Column("pages", Integer, nullable=False),
+)
+
+RECORD_KINDS = ("courses", "assignments", "modules")
+
+
+def account_key(api_token, base_url):
+    """Identifies one Canvas user on one instance, without storing the token itself"""
+    return f"{token_identity(api_token)}|{base_url}"
+
+
+class SnapshotStore:
+    """Persists the CourseRepository from the last successful sync."""
+
+    def __init__(self, db_path):
+        self.engine = create_engine(
+            f"sqlite:///{db_path}",
+            connect_args={"check_same_thread": False}
+        )
+        metadata.create_all(self.engine)
+
+    def load(self, account):
+        """Returns the CourseRepository saved for `account`, or None."""
+        with self.engine.connect() as conn:
+            if not self.__matches(conn, account):
+                return None
+
+            records = {kind: [] for kind in RECORD_KINDS}
+            rows = conn.execute(
+                select(snapshot_records.c.kind, snapshot_records.c.payload)
+                .order_by(snapshot_records.c.kind, snapshot_records.c.position)
+            )
+            for kind, payload in rows:
+                if kind in records:
+                    records[kind].append(payload)
+
+        return CourseRepository(
+            [Course(**payload) for payload in records["courses"]],
+            {p["course_id"]: [Assignment(**a) for a in p["items"]] for p in records["assignments"]},
+            {p["course_id"]: [Module.from_dict(m) for m in p["items"]] for p in records["modules"]},
+        )
+
+    def load_validators(self, account):
+        """Returns the endpoint validators saved alongside `account`'s snapshot."""
+        with self.engine.connect() as conn:
+            if not self.__matches(conn, account):
+                return {}
+            rows = conn.execute(select(sync_validators))
+            return {
+                row.endpoint: {"etag": row.etag, "last_modified": row.last_modified, "pages": row.pages}
+                for row in rows
+            }
+
+    def save(self, account, data, validators=None):
+        """Replaces the snapshot with a freshly synced CourseRepository in a single transaction."""
+        records = {
+            "courses": [asdict(course) for course in data],
+            "assignments": [
+                {"course_id": course_id, "items": [asdict(a) for a in items]}
+                for course_id, items in data.assignments.items()
+            ],
+            "modules": [
+                {"course_id": course_id, "items": [asdict(m) for m in items]}
+                for course_id, items in data.modules.items()
+            ],
+        }
+        with self.engine.begin() as conn:
+            conn.execute(delete(sync_validators))
+            if validators:
+                conn.execute(sync_validators.insert(), [
+                    {"endpoint": endpoint, **validator}
+                    for endpoint, validator in validators.items()
+                ])
+
+            conn.execute(delete(snapshot_records))
+            for kind, items in records.items():
+                if items:
+                    conn.execute(snapshot_records.insert(), [
+                        {"kind": kind, "position": i, "payload": item}
+                        for i, item in enumerate(items)
+                    ])
+
+            conn.execute(delete(snapshot_meta))
+            conn.execute(snapshot_meta.insert(), [
+                {"key": "version", "value": str(SNAPSHOT_VERSION)},
+                {"key": "account", "value": account},
+                {"key": "synced_at", "value": datetime.now(timezone.utc).isoformat()},
+            ])
+
+    @staticmethod
+    def __matches(conn, account):
+        meta = dict(conn.execute(select(snapshot_meta.c.key, snapshot_meta.c.value)).all())
+        return meta.get("version") == str(SNAPSHOT_VERSION) and meta.get("account") == account